@@ -0,0 +1,89 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import connections, transaction
+
+
+class LogWriter:
+    """ In-process buffer of ``UserLogs`` rows written with ``bulk_create``.
+
+        Entries reach the buffer when the transaction that produced them
+        commits and are flushed once ``batch_size`` of them are waiting or the
+        oldest one is ``interval`` seconds old, whichever comes first. With
+        ``USER_LOGS_ASYNC`` disabled every entry is saved right away.
+
+        Buffered entries live in memory only: those waiting when the process
+        is killed (rather than exiting normally) are lost.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+        self.since = None
+        self.timer = None
+
+    @property
+    def batch_size(self):
+        return getattr(settings, "USER_LOGS_BATCH_SIZE", 100)
+
+    @property
+    def interval(self):
+        return getattr(settings, "USER_LOGS_FLUSH_INTERVAL", 2)
+
+    def enqueue(self, entry):
+        if not getattr(settings, "USER_LOGS_ASYNC", True):
+            entry.save(force_insert=True)
+            return
+        transaction.on_commit(lambda: self.append(entry))
+
+    def append(self, entry):
+        with self.lock:
+            if not self.pending:
+                self.since = time.monotonic()
+            self.pending.append(entry)
+            due = len(self.pending) >= self.batch_size or (
+                time.monotonic() - self.since >= self.interval
+            )
+            if not due and self.timer is None:
+                self.timer = threading.Timer(self.interval, self.timed_flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        from accounts.models import UserLogs
+
+        with self.lock:
+            entries, self.pending = self.pending, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not entries:
+            return
+        try:
+            with transaction.atomic():
+                UserLogs.objects.bulk_create(
+                    entries, batch_size=self.batch_size
+                )
+        except Exception as e:
+            logging.error(e)
+            # Keep the valid entries of a failed batch, one at a time.
+            for entry in entries:
+                try:
+                    with transaction.atomic():
+                        entry.save(force_insert=True)
+                except Exception as e:
+                    logging.error(e)
+
+    def timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+writer = LogWriter()
+atexit.register(writer.flush)
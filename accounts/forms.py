@@ -11,7 +11,7 @@ from django.utils.translation import gettext as _
 from crispy_forms import layout, helper
 from django.contrib.auth.password_validation import validate_password
 from core.utils.utils import get_form_button
-from . import models
+from . import models, outbox
 from dashboard import forms as dash_forms
 from django.contrib.auth.models import Permission
 from django.conf import settings
@@ -338,7 +338,32 @@ class PasswordResetForm(DjangoPasswordResetForm):
             to=[to_email], reply_to=[from_email]
         )
         mail.content_subtype = "html"
-        return mail.send()
+        return outbox.send(mail)
+
+
+class UserBulkInviteForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV file with an Email column and optional Name, "
+                  "Designation, Groups (separated by commas) and Staff "
+                  "columns.",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv'})
+    )
+    dry_run = forms.BooleanField(
+        required=False, initial=True,
+        help_text="Only check the rows, nobody is invited."
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = helper.FormHelper()
+        self.helper.layout = layout.Layout(
+            'file',
+            'dry_run',
+            layout.Column(
+                layout.Submit('submit', "Invite", css_class="px-4"),
+                css_class='text-end'
+            ),
+        )
 
 
 class UserInviteModelForm(forms.ModelForm):
@@ -0,0 +1,200 @@
+import csv
+import time
+import uuid
+from itertools import islice
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.urls import reverse
+from accounts import email, models
+
+HEADERS = {
+    "email": "email",
+    "name": "name",
+    "designation": "designation",
+    "group": "groups", "groups": "groups",
+    "staff": "is_staff", "is_staff": "is_staff",
+}
+TRUE = {"1", "true", "yes", "y"}
+
+
+class InviteResult:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.lines = []
+        self.invited = 0
+        self.started = time.monotonic()
+        self.elapsed = 0
+
+    def add(self, line, email, message, ok=False):
+        self.lines.append((line, email, message, ok))
+
+    @property
+    def rows(self):
+        return len(self.lines)
+
+    @property
+    def errors(self):
+        return [line for line in self.lines if not line[3]]
+
+
+class UserInviter:
+    """ Invites users from CSV rows (email, name, designation, groups,
+        staff), ``chunk_size`` at a time.
+
+        A chunk checks its emails against the existing users with one query,
+        then creates its users, tokens, group memberships and user logs with
+        ``bulk_create`` in one transaction; the invite emails are queued
+        together once it commits. Every row gets a result line.
+    """
+
+    def __init__(self, user, request=None, chunk_size=500, dry_run=False,
+                 context=None):
+        self.user = user
+        self.request = request
+        # Site values (domain, protocol, site_name) of the invite emails,
+        # needed without a request.
+        self.context = context or {}
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.designations = {
+            title.strip().lower(): pk
+            for pk, title in models.DesignationModel.objects.filter(
+                is_active=True
+            ).values_list("pk", "title")
+        }
+        self.groups = {
+            name.strip().lower(): pk
+            for pk, name in models.Group.objects.values_list("pk", "name")
+        }
+        self.emails = set()
+
+    def run(self, file):
+        """ Invite the users of the CSV text ``file``, returning an
+            ``InviteResult``.
+        """
+        result = InviteResult(self.dry_run)
+        reader = csv.DictReader(file)
+        fields = [self.get_field(header) for header in reader.fieldnames or []]
+        unknown = [
+            header for header, field in zip(reader.fieldnames or [], fields)
+            if field is None
+        ]
+        if "email" not in fields:
+            result.add(1, "", "The file needs an Email column.")
+        elif unknown:
+            result.add(1, "", f"Unknown columns: {', '.join(unknown)}.")
+        else:
+            rows = enumerate(reader, start=2)
+            while chunk := list(islice(rows, self.chunk_size)):
+                self.invite_chunk(chunk, result)
+        result.lines.sort()
+        result.elapsed = time.monotonic() - result.started
+        return result
+
+    @staticmethod
+    def get_field(header):
+        return HEADERS.get((header or "").strip().lower())
+
+    def invite_chunk(self, chunk, result):
+        cleaned = []
+        for line, row in chunk:
+            values = {
+                self.get_field(header): (raw or "").strip()
+                for header, raw in row.items() if self.get_field(header)
+            }
+            try:
+                cleaned.append((line, self.clean_row(values)))
+            except ValidationError as e:
+                result.add(line, values.get("email", ""), " ".join(e.messages))
+        # Addresses differing only in case belong to the same person.
+        taken = set(get_user_model().objects.annotate(
+            email_lower=Lower("email")
+        ).filter(email_lower__in=[
+            values["email"].lower() for _, values in cleaned
+        ]).values_list("email_lower", flat=True))
+        valid = []
+        for line, values in cleaned:
+            address = values["email"]
+            if address.lower() in taken or address.lower() in self.emails:
+                result.add(line, address, "A user with this email exists.")
+                continue
+            self.emails.add(address.lower())
+            valid.append((line, values))
+        if not self.dry_run and valid:
+            with transaction.atomic():
+                self.save([values for _, values in valid])
+        for line, values in valid:
+            result.add(
+                line, values["email"],
+                "Valid." if self.dry_run else "Invited.", ok=True
+            )
+        if not self.dry_run:
+            result.invited += len(valid)
+
+    def clean_row(self, values):
+        errors = []
+        address = get_user_model().objects.normalize_email(
+            values.get("email", "")
+        )
+        try:
+            validate_email(address)
+        except ValidationError:
+            errors.append(f"{address or 'Email'} is not a valid email.")
+        designation = values.get("designation")
+        if designation and designation.lower() not in self.designations:
+            errors.append(f"Designation {designation} does not exist.")
+        groups = []
+        for name in filter(None, map(
+            str.strip, values.get("groups", "").split(",")
+        )):
+            if name.lower() not in self.groups:
+                errors.append(f"Group {name} does not exist.")
+            else:
+                groups.append(self.groups[name.lower()])
+        if errors:
+            raise ValidationError(errors)
+        return {
+            "email": address,
+            "name": values.get("name") or None,
+            "designation": self.designations.get((designation or "").lower()),
+            "groups": set(groups),
+            "is_staff": values.get("is_staff", "").lower() in TRUE,
+        }
+
+    def save(self, rows):
+        User = get_user_model()
+        Membership = User.groups.through
+        users = User.objects.bulk_create([
+            User(
+                email=values["email"], name=values["name"],
+                designation_id=values["designation"],
+                is_staff=values["is_staff"], is_active=False,
+                password=make_password(None),
+            ) for values in rows
+        ])
+        Membership.objects.bulk_create([
+            Membership(users_id=user.pk, group_id=group)
+            for user, values in zip(users, rows)
+            for group in values["groups"]
+        ])
+        expires = models.UserToken.expires_date()
+        tokens = models.UserToken.objects.bulk_create([
+            models.UserToken(
+                user=user, token=uuid.uuid4().hex, expires=expires,
+                type=models.UserToken.TokenType.INVITE
+            ) for user in users
+        ])
+        models.UserLogs.create_logs(
+            self.request, users, models.ADDITION, user=self.user
+        )
+        email.UserInviteEmail.send_many([
+            ([token.user.email], {
+                **self.context,
+                "url": reverse("set_password", kwargs={"token": token.token})
+            }) for token in tokens
+        ], request=self.request)
+        return users
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from accounts.invites import UserInviter
+
+
+class Command(BaseCommand):
+    help = (
+        "Invite users from a CSV file with an Email column and optional "
+        "Name, Designation, Groups and Staff columns. The invite emails are "
+        "queued in the outbox."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file, UTF-8 encoded.")
+        parser.add_argument(
+            "--user", required=True,
+            help="Email of the user the invites are sent by."
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only validate the rows and report the errors."
+        )
+        parser.add_argument(
+            "--domain",
+            help="Domain of the invite links, the current site's by default."
+        )
+        parser.add_argument(
+            "--protocol", choices=("http", "https"), default="https",
+            help="Protocol of the invite links."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}.")
+        # Without a request the invite links need the site given here.
+        site = Site.objects.get_current()
+        inviter = UserInviter(
+            user, chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"], context={
+                "domain": options["domain"] or site.domain,
+                "site_name": site.name,
+                "protocol": options["protocol"],
+            }
+        )
+        try:
+            with open(
+                options["path"], encoding="utf-8-sig", newline=""
+            ) as file:
+                result = inviter.run(file)
+        except OSError as e:
+            raise CommandError(e)
+        for line, address, message, ok in result.lines:
+            (self.stdout if ok else self.stderr).write(
+                f"Line {line}: {address} {message}"
+            )
+        self.stdout.write(
+            f"{result.rows} rows, {len(result.errors)} errors, "
+            f"{result.invited} users invited in {result.elapsed:.2f}s."
+        )
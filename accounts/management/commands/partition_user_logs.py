@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounts import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition the user_log table by month on action_time (PostgreSQL) "
+        "and create the partitions of the coming months. Run it again "
+        "every month, or let purge_user_logs do it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=3,
+            help="Number of future monthly partitions to keep ready."
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            raise CommandError(
+                "Partitioning needs PostgreSQL, purge_user_logs falls back "
+                "to chunked deletes on this database."
+            )
+        months_ahead = options["months_ahead"]
+        if not partitions.is_partitioned():
+            partitions.partition_table(months_ahead)
+            self.stdout.write(f"{partitions.TABLE} is now partitioned.")
+        created = partitions.create_partitions(timezone.now(), months_ahead)
+        for name in created:
+            self.stdout.write(f"Created partition {name}.")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from accounts.models import UserToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the expired user tokens in chunks, meant to run "
+        "periodically (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = UserToken.purge_expired(options["chunk_size"])
+        self.stdout.write(f"Deleted {deleted} expired tokens.")
@@ -0,0 +1,112 @@
+import os
+from contextlib import ExitStack
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from accounts import partitions
+from accounts.models import UserLogs
+from configuration import cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove the user logs older than the retention of the general "
+        "settings, optionally archived as gzipped JSON lines. Partitioned "
+        "tables drop whole months, other databases delete in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int,
+            help="Retention in days, overrides the general settings."
+        )
+        parser.add_argument(
+            "--archive-dir",
+            help="Directory receiving a .jsonl.gz archive of removed rows."
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--months-ahead", type=int, default=3)
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = cache.get_runtime_config(
+                Site.objects.get_current()
+            ).user_logs_retention_days
+        if not days:
+            self.stdout.write("User logs retention is disabled.")
+            return
+        archive_dir = options["archive_dir"]
+        if archive_dir and not os.path.isdir(archive_dir):
+            raise CommandError(f"{archive_dir} is not a directory.")
+        cutoff = timezone.now() - timezone.timedelta(days=days)
+
+        if partitions.is_partitioned():
+            partitions.create_partitions(
+                timezone.now(), options["months_ahead"]
+            )
+            self.drop_partitions(cutoff, archive_dir)
+            self.purge_default(cutoff, archive_dir, options["chunk_size"])
+        else:
+            self.delete_chunks(cutoff, archive_dir, options["chunk_size"])
+
+    def drop_partitions(self, cutoff, archive_dir):
+        # Only months entirely before the cutoff are dropped, the rows of
+        # the current one wait for the next run.
+        for name, start in partitions.get_partitions():
+            if partitions.add_months(start, 1) > cutoff:
+                break
+            archive_path = archive_dir and os.path.join(
+                archive_dir, f"{name}.jsonl.gz"
+            )
+            partitions.drop_partition(name, archive_path)
+            self.stdout.write(f"Dropped partition {name}.")
+
+    def purge_default(self, cutoff, archive_dir, chunk_size):
+        # Rows stored while their month had no partition yet.
+        deleted = 0
+        with ExitStack() as stack:
+            archive = None
+            for rows in partitions.purge_default(cutoff, chunk_size):
+                if archive_dir and archive is None:
+                    archive = stack.enter_context(partitions.open_archive(
+                        os.path.join(
+                            archive_dir,
+                            f"{partitions.DEFAULT_PARTITION}_"
+                            f"{cutoff:%Y%m%dT%H%M%S}.jsonl.gz"
+                        )
+                    ))
+                if archive is not None:
+                    partitions.write_rows(archive, rows)
+                deleted += len(rows)
+        self.stdout.write(
+            f"Deleted {deleted} user logs of the default partition."
+        )
+
+    def delete_chunks(self, cutoff, archive_dir, chunk_size):
+        queryset = UserLogs.objects.filter(
+            action_time__lt=cutoff
+        ).order_by("action_time", "id")
+        deleted = 0
+        with ExitStack() as stack:
+            archive = None
+            while chunk := list(
+                queryset.values_list(*partitions.COLUMNS)[:chunk_size]
+            ):
+                if archive_dir and archive is None:
+                    archive = stack.enter_context(partitions.open_archive(
+                        os.path.join(
+                            archive_dir,
+                            f"{partitions.TABLE}_{cutoff:%Y%m%dT%H%M%S}"
+                            f".jsonl.gz"
+                        )
+                    ))
+                if archive is not None:
+                    partitions.write_rows(archive, chunk)
+                with transaction.atomic():
+                    UserLogs.objects.filter(
+                        pk__in=[row[0] for row in chunk]
+                    ).delete()
+                deleted += len(chunk)
+        self.stdout.write(f"Deleted {deleted} user logs.")
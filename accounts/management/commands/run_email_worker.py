@@ -0,0 +1,50 @@
+import time
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from accounts import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the queued emails in batches over one reused connection of "
+        "EMAIL_BACKEND. Several workers can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once no email is due instead of waiting for more."
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=2,
+            help="Seconds to wait between checks of an empty queue."
+        )
+        parser.add_argument(
+            "--batch-size", type=int,
+            default=getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50)
+        )
+        parser.add_argument(
+            "--stale-after", type=int, default=10 * 60,
+            help="Queue again emails claimed this many seconds ago."
+        )
+
+    def handle(self, *args, **options):
+        retention = getattr(settings, "EMAIL_OUTBOX_RETENTION_DAYS", 30)
+        connection = get_connection()
+        try:
+            while True:
+                outbox.release_stale(options["stale_after"])
+                outbox.purge(retention)
+                while emails := outbox.claim(options["batch_size"]):
+                    sent = outbox.deliver(emails, connection)
+                    self.stdout.write(f"{sent}/{len(emails)} emails sent.")
+                # Only keep the connection open while there is mail to send.
+                connection.close()
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='userlogs',
+            options={'ordering': ['-action_time', '-id'], 'permissions': [('export_login_logs', 'Can Export Login Logs')], 'verbose_name': 'user log entry', 'verbose_name_plural': 'user log entries'},
+        ),
+        migrations.AddIndex(
+            model_name='userlogs',
+            index=models.Index(fields=['action_time', 'id'], name='user_log_time_id_idx'),
+        ),
+    ]
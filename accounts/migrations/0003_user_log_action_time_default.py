@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_log_time_id_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userlogs',
+            name='action_time',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='action time'),
+        ),
+    ]
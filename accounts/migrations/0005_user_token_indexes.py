@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usertoken',
+            name='expires',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='usertoken',
+            name='token',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
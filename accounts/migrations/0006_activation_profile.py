@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_token_indexes'),
+        ('registration', '0005_activation_key_sha256'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivationProfile',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('registration.registrationprofile',),
+        ),
+    ]
@@ -1,16 +1,23 @@
 import logging
 import uuid
-from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from accounts import audit
 from accounts.managers import UserManager
+from core.utils import renditions
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext as _
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group as DjangoGroup
 from django.urls import reverse_lazy
 from core.base.model import BaseModel
+from configuration.cache import get_request_config, get_runtime_config
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.template.loader import render_to_string
+from registration.models import RegistrationProfile, get_from_email
 from django.utils import timezone
+from django.utils.html import format_html
 from django.shortcuts import get_object_or_404
 
 
@@ -160,14 +167,23 @@ class Users(AbstractUser, BaseModel):
               <path fill-rule="evenodd" d="M0 8a8 8 0 1 1 16 0A8 8 0 0 1 0 8zm8-7a7 7 0 0 0-5.468 11.37C3.242 11.226 4.805 10 8 10s4.757 1.225 5.468 2.37A7 7 0 0 0 8 1z"/>
             </svg>"""  # noqa
 
+    def get_avatar_img(self, _class, size):
+        return format_html(
+            '<img class="{}" src="{}" srcset="{}" width="{}" height="{}" '
+            'alt="">', _class, renditions.get_url(self.avatar, "avatar", size),
+            renditions.get_srcset(self.avatar, "avatar", size), size, size
+        )
+
     def get_avatar_10(self):
         if self.avatar:
-            return f"""<img class="rounded-circle w-10 h-10 ms-2" src="{self.avatar.url}">"""  # noqa
+            return self.get_avatar_img("rounded-circle w-10 h-10 ms-2", 40)
         return self.get_avatar_svg("h-8 w-8")
 
     def get_avatar_16(self):
         if self.avatar:
-            return f"""<img class="rounded-circle w-16 h-16 ms-2 ms-0" src="{self.avatar.url}">"""  # noqa
+            return self.get_avatar_img(
+                "rounded-circle w-16 h-16 ms-2 ms-0", 64
+            )
         return self.get_avatar_svg("h-16 w-16")
 
     def get_full_name(self):
@@ -203,7 +219,7 @@ class UserLogs(BaseModel):
     )
     message = models.TextField(_("change message"), blank=True)
     action_time = models.DateTimeField(
-        _("action time"), auto_now_add=True, editable=False
+        _("action time"), default=timezone.now, editable=False
     )
 
     def __str__(self):
@@ -214,7 +230,12 @@ class UserLogs(BaseModel):
         verbose_name = _("user log entry")
         verbose_name_plural = _("user log entries")
         db_table = "user_log"
-        ordering = ["-action_time"]
+        ordering = ["-action_time", "-id"]
+        indexes = [
+            models.Index(
+                fields=["action_time", "id"], name="user_log_time_id_idx"
+            ),
+        ]
 
     def get_action_html(self):
         if ADDITION == self.action:
@@ -242,28 +263,53 @@ class UserLogs(BaseModel):
 
     @classmethod
     def create_log(cls, request, _obj, _action, changed_data=None):
-        if settings.USER_LOGS:
-            try:
-                app_label = _obj._meta.app_label
-                model = _obj._meta.model_name
-                verbose_name = _obj._meta.verbose_name
-                content_type = ContentType.objects.get(
-                    app_label=app_label, model=model
+        if not get_request_config(request).user_logs:
+            return
+        if _action == CHANGE and not changed_data:
+            return
+        try:
+            opts = _obj._meta
+            user_log = cls(
+                user_id=request.user.pk,
+                content_type=ContentType.objects.get_for_model(
+                    opts.model, for_concrete_model=False
+                ),
+                action=_action,
+                message=cls.get_action(
+                    _action, changed_data, _obj, opts.verbose_name
                 )
-                message = cls.get_action(
-                    _action, changed_data, _obj, verbose_name
-                )
-                user_log = UserLogs.objects.create(
-                    user=request.user, content_type=content_type,
-                    action=_action, message=message
-                )
-                if not _action == DELETION:
-                    user_log.object_id = _obj.pk
-                    user_log.save()
-                if not changed_data and _action == CHANGE:
-                    user_log.delete()
-            except Exception as e:
-                logging.error(e)
+            )
+            if not _action == DELETION:
+                user_log.object_id = _obj.pk
+            audit.writer.enqueue(user_log)
+        except Exception as e:
+            logging.error(e)
+
+    @classmethod
+    def create_logs(cls, request, objects, _action, changed_data=None,
+                    user=None):
+        """ ``create_log`` for many objects of one model, inserted with a
+            single ``bulk_create`` in the current transaction. Commands pass
+            the acting ``user`` and no request.
+        """
+        if not objects or not get_request_config(request).user_logs:
+            return
+        if _action == CHANGE and not changed_data:
+            return
+        user = user or request.user
+        opts = objects[0]._meta
+        content_type = ContentType.objects.get_for_model(
+            opts.model, for_concrete_model=False
+        )
+        cls.objects.bulk_create([
+            cls(
+                user_id=user.pk, content_type=content_type, action=_action,
+                message=cls.get_action(
+                    _action, changed_data, _obj, opts.verbose_name
+                ),
+                object_id=None if _action == DELETION else _obj.pk
+            ) for _obj in objects
+        ], batch_size=audit.writer.batch_size)
 
 
 class UserToken(models.Model):
@@ -273,9 +319,12 @@ class UserToken(models.Model):
     user = models.OneToOneField(
         get_user_model(), on_delete=models.CASCADE, related_name="token"
     )
-    token = models.CharField(max_length=100)
+    token = models.CharField(max_length=100, unique=True)
     type = models.PositiveSmallIntegerField(choices=TokenType.choices)
-    expires = models.DateTimeField()
+    expires = models.DateTimeField(db_index=True)
+
+    # Attempts of make_token at a token not taken yet.
+    MAKE_TOKEN_ATTEMPTS = 3
 
     @classmethod
     def expires_date(cls):
@@ -283,18 +332,134 @@ class UserToken(models.Model):
 
     @classmethod
     def make_token(cls, user, type):
-        token = uuid.uuid4().hex
-        if not cls.objects.filter(user=user, token=token).exists():
-            user_token = cls.objects.create(
-                user=user, token=token, type=type,
-                expires=cls.expires_date()
-            )
-            print(user_token)
+        """ Create a token of ``type`` for ``user``. The unique index on
+            ``token`` rejects a duplicate, a new token is then tried; an
+            IntegrityError is raised when the user already has a token.
+        """
+        for attempt in range(cls.MAKE_TOKEN_ATTEMPTS):
+            token = uuid.uuid4().hex
+            try:
+                with transaction.atomic():
+                    user_token = cls.objects.create(
+                        user=user, token=token, type=type,
+                        expires=cls.expires_date()
+                    )
+            except IntegrityError:
+                # The user already has a token, another one would not help.
+                if attempt == cls.MAKE_TOKEN_ATTEMPTS - 1 or (
+                    cls.objects.filter(user=user).exists()
+                ):
+                    raise
+                continue
             return token, user_token
-        return cls.make_token(user, type)
+
+    @classmethod
+    def purge_expired(cls, chunk_size=1000):
+        """ Delete the expired tokens ``chunk_size`` at a time, each chunk
+            in its own short transaction; returns the number deleted.
+        """
+        expired = cls.objects.filter(expires__lt=timezone.now())
+        deleted = 0
+        while chunk := list(
+            expired.order_by("expires").values_list("pk", flat=True)[
+                :chunk_size
+            ]
+        ):
+            with transaction.atomic():
+                deleted += cls.objects.filter(pk__in=chunk).delete()[0]
+        return deleted
 
     @classmethod
     def check_token(cls, token, type):
         return get_object_or_404(
             UserToken, token=token, type=type, expires__gte=timezone.now()
         )
+
+
+class OutboxEmail(BaseModel):
+    """ Email queued by ``accounts.outbox.enqueue`` and sent by
+        ``run_email_worker``; the ones failing every attempt are kept as
+        FAILED (dead letters).
+    """
+    class EmailStatus(models.IntegerChoices):
+        QUEUED = 1, _("Queued")
+        SENDING = 2, _("Sending")
+        SENT = 3, _("Sent")
+        FAILED = 4, _("Failed")
+
+    subject = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    html = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    status = models.PositiveSmallIntegerField(
+        choices=EmailStatus.choices, default=EmailStatus.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.UUIDField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "outbox_email"
+        verbose_name = _("Outbox Email")
+        verbose_name_plural = _("Outbox Emails")
+        ordering = ["next_attempt_at"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outbox_email_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
+
+
+class ActivationProfile(RegistrationProfile):
+    """ ``RegistrationProfile`` expiring after the activation days of the
+        site settings instead of ``ACCOUNT_ACTIVATION_DAYS``.
+    """
+
+    class Meta:
+        proxy = True
+
+    @staticmethod
+    def get_activation_days(site=None):
+        return get_runtime_config(
+            site or Site.objects.get_current()
+        ).activation_days
+
+    def activation_key_expired(self):
+        expires = self.user.date_joined + timezone.timedelta(
+            days=self.get_activation_days()
+        )
+        return self.activated or expires <= timezone.now()
+
+    def send_activation_email(self, site, request=None):
+        from accounts import outbox
+
+        context = {
+            "user": self.user,
+            "activation_key": self.activation_key,
+            "expiration_days": self.get_activation_days(site),
+            "site": site,
+        }
+        subject = "".join(render_to_string(
+            "registration/activation_email_subject.txt", context,
+            request=request
+        ).splitlines())
+        message = mail.EmailMultiAlternatives(
+            subject, render_to_string(
+                "registration/activation_email.txt", context, request=request
+            ), get_from_email(site), [self.user.email]
+        )
+        message.attach_alternative(render_to_string(
+            "registration/activation_email.html", context, request=request
+        ), "text/html")
+        return outbox.send(message)
@@ -0,0 +1,160 @@
+import logging
+import uuid
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+from accounts.models import OutboxEmail
+
+EmailStatus = OutboxEmail.EmailStatus
+
+
+def is_enabled():
+    return getattr(settings, "EMAIL_OUTBOX", True)
+
+
+def get_email(message):
+    """ Unsaved ``OutboxEmail`` of the rendered ``message``. """
+    html = next((
+        content for content, mimetype in getattr(message, "alternatives", [])
+        if mimetype == "text/html"
+    ), "")
+    if not html and message.content_subtype == "html":
+        html, body = message.body, ""
+    else:
+        body = message.body
+    return OutboxEmail(
+        subject=message.subject, body=body, html=html,
+        from_email=message.from_email or "", to=list(message.to),
+        cc=list(message.cc), bcc=list(message.bcc),
+        reply_to=list(message.reply_to), headers=dict(message.extra_headers)
+    )
+
+
+def enqueue(message):
+    """ Queue the rendered ``message`` once the current transaction commits,
+        nothing is sent for a transaction rolled back.
+    """
+    email = get_email(message)
+    transaction.on_commit(email.save)
+    return email
+
+
+def enqueue_many(messages):
+    """ ``enqueue`` for many messages, inserted with one ``bulk_create``. """
+    emails = [get_email(message) for message in messages]
+    if emails:
+        transaction.on_commit(
+            lambda: OutboxEmail.objects.bulk_create(emails)
+        )
+    return emails
+
+
+def send(message):
+    """ Queue ``message`` with ``EMAIL_OUTBOX``, send it right away
+        otherwise.
+    """
+    if is_enabled():
+        enqueue(message)
+        return 1
+    return message.send()
+
+
+def claim(limit):
+    """ Mark up to ``limit`` due emails as sending and return them. Emails
+        are only returned to the worker whose UPDATE claimed them, so several
+        workers can share the queue.
+    """
+    now = timezone.now()
+    due = OutboxEmail.objects.filter(
+        status=EmailStatus.QUEUED, next_attempt_at__lte=now
+    )
+    ids = list(due.order_by("next_attempt_at").values_list(
+        "pk", flat=True
+    )[:limit])
+    if not ids:
+        return []
+    token = uuid.uuid4()
+    due.filter(pk__in=ids).update(
+        status=EmailStatus.SENDING, claimed_by=token, updated_at=now
+    )
+    return list(OutboxEmail.objects.filter(claimed_by=token))
+
+
+def get_message(email, connection):
+    message = mail.EmailMultiAlternatives(
+        subject=email.subject, body=email.body or email.html,
+        from_email=email.from_email or None, to=email.to, cc=email.cc,
+        bcc=email.bcc, reply_to=email.reply_to, headers=email.headers,
+        connection=connection
+    )
+    if email.html and email.body:
+        message.attach_alternative(email.html, "text/html")
+    elif email.html:
+        message.content_subtype = "html"
+    return message
+
+
+def get_retry_delay(attempts):
+    """ Seconds before the next attempt, doubling from
+        ``EMAIL_OUTBOX_RETRY_DELAY`` after every failure.
+    """
+    delay = getattr(settings, "EMAIL_OUTBOX_RETRY_DELAY", 60)
+    return min(delay * 2 ** (attempts - 1), 24 * 60 * 60)
+
+
+def deliver(emails, connection):
+    """ Send ``emails`` over the open ``connection``, returning the number
+        sent. A failed email is retried later, or kept as FAILED after
+        ``EMAIL_OUTBOX_MAX_ATTEMPTS``; the connection is reopened after a
+        failure.
+    """
+    max_attempts = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 6)
+    sent = 0
+    for email in emails:
+        email.attempts += 1
+        email.claimed_by = None
+        try:
+            connection.open()
+            connection.send_messages([get_message(email, connection)])
+        except Exception as e:
+            logging.error(e)
+            connection.close()
+            email.error = str(e)
+            if email.attempts >= max_attempts:
+                email.status = EmailStatus.FAILED
+            else:
+                email.status = EmailStatus.QUEUED
+                email.next_attempt_at = timezone.now() + timezone.timedelta(
+                    seconds=get_retry_delay(email.attempts)
+                )
+        else:
+            sent += 1
+            email.status = EmailStatus.SENT
+            email.sent_at = timezone.now()
+            email.error = ""
+        email.save(update_fields=[
+            "status", "attempts", "claimed_by", "error", "next_attempt_at",
+            "sent_at", "updated_at"
+        ])
+    return sent
+
+
+def release_stale(seconds):
+    """ Queue again the emails claimed by a worker that stopped before
+        sending them.
+    """
+    return OutboxEmail.objects.filter(
+        status=EmailStatus.SENDING,
+        updated_at__lt=timezone.now() - timezone.timedelta(seconds=seconds)
+    ).update(
+        status=EmailStatus.QUEUED, claimed_by=None, updated_at=timezone.now()
+    )
+
+
+def purge(days):
+    """ Delete the emails sent more than ``days`` ago. """
+    return OutboxEmail.objects.filter(
+        status=EmailStatus.SENT,
+        sent_at__lt=timezone.now() - timezone.timedelta(days=days)
+    ).delete()[0]
@@ -0,0 +1,225 @@
+import gzip
+import json
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import UserLogs
+
+
+TABLE = UserLogs._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+COLUMNS = (
+    "id", "user_id", "content_type_id", "object_id", "action", "message",
+    "action_time"
+)
+PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value):
+    return value.astimezone(dt_timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+def partition_name(start):
+    return f"{TABLE}_p{start:%Y%m}"
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned():
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+            [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partitions():
+    """ ``(name, start)`` of the monthly partitions, oldest first. """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, datetime(
+                int(match.group(1)), int(match.group(2)), 1,
+                tzinfo=dt_timezone.utc
+            )))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partitions(since, months_ahead):
+    """ Create the missing monthly partitions from ``since`` up to
+        ``months_ahead`` months after the current one.
+
+        Rows of a new month already stored in the default partition, when the
+        partitions were not created in time, are moved into it before it is
+        attached: PostgreSQL refuses the partition otherwise.
+    """
+    qn = connection.ops.quote_name
+    start = month_start(since)
+    last = add_months(month_start(timezone.now()), months_ahead)
+    created = []
+    while start <= last:
+        end = add_months(start, 1)
+        name = partition_name(start)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_class WHERE relname = %s", [name]
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    f"LOCK TABLE {qn(DEFAULT_PARTITION)} "
+                    f"IN ACCESS EXCLUSIVE MODE"
+                )
+                cursor.execute(
+                    f"CREATE TABLE {qn(name)} (LIKE {qn(TABLE)} "
+                    f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+                    f"WHERE action_time >= %s AND action_time < %s "
+                    f"RETURNING *) INSERT INTO {qn(name)} SELECT * FROM moved",
+                    [start, end]
+                )
+                cursor.execute(
+                    f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(name)} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') "
+                    f"TO ('{end.isoformat()}')"
+                )
+                created.append(name)
+        start = end
+    return created
+
+
+@transaction.atomic
+def partition_table(months_ahead):
+    """ Rebuild ``user_log`` as a table partitioned by month on
+        ``action_time``. The table is locked while the rows are copied.
+    """
+    qn = connection.ops.quote_name
+    legacy = f"{TABLE}_legacy"
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u'))",
+            [TABLE, TABLE]
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'", [TABLE]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT min(action_time) FROM {qn(TABLE)}")
+        since = cursor.fetchone()[0] or timezone.now()
+
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE)} (LIKE {qn(legacy)} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (action_time)"
+        )
+        cursor.execute(
+            f"CREATE TABLE {qn(DEFAULT_PARTITION)} "
+            f"PARTITION OF {qn(TABLE)} DEFAULT"
+        )
+        create_partitions(since, months_ahead)
+        cursor.execute(
+            f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(legacy)}"
+        )
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+        # The partition key has to be part of the primary key.
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, action_time)"
+        )
+        for index in indexes:
+            cursor.execute(index)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} "
+                f"{definition}"
+            )
+
+
+def open_archive(path):
+    return gzip.open(path, "wt", encoding="utf-8")
+
+
+def write_rows(archive, rows):
+    """ Write ``COLUMNS`` tuples as JSON lines. """
+    for row in rows:
+        archive.write(json.dumps(dict(zip(COLUMNS, row)), default=str))
+        archive.write("\n")
+
+
+def _iter_table(name, chunk_size=2000):
+    qn = connection.ops.quote_name
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(map(qn, COLUMNS))} FROM {qn(name)} "
+            f"ORDER BY action_time, id"
+        )
+        while rows := cursor.fetchmany(chunk_size):
+            yield from rows
+
+
+def drop_partition(name, archive_path=None):
+    """ Detach and drop one partition, exported to ``archive_path`` first
+        when it is given.
+    """
+    qn = connection.ops.quote_name
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}"
+            )
+        if archive_path:
+            with open_archive(archive_path) as archive:
+                write_rows(archive, _iter_table(name))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {qn(name)}")
+
+
+def purge_default(cutoff, chunk_size=5000):
+    """ Delete the rows of the default partition older than ``cutoff``,
+        ``chunk_size`` at a time, yielding the deleted ``COLUMNS`` tuples of
+        every chunk once it is committed.
+    """
+    qn = connection.ops.quote_name
+    columns = ", ".join(map(qn, COLUMNS))
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {qn(DEFAULT_PARTITION)} WHERE (id, action_time)"
+                f" IN (SELECT id, action_time FROM {qn(DEFAULT_PARTITION)} "
+                f"WHERE action_time < %s ORDER BY action_time, id LIMIT %s) "
+                f"RETURNING {columns}", [cutoff, chunk_size]
+            )
+            rows = cursor.fetchall()
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
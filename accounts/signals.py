@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+from registration import signals
+from configuration.cache import get_request_config
+from core.utils import permissions, renditions
+from . import models
+
+
+@receiver(signals.user_activated)
+def auto_login_activated_user(sender, user, request, **kwargs):
+    if get_request_config(request).registration_auto_login:
+        signals.login_user(sender, user, request)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+@receiver(m2m_changed, sender=get_user_model().user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=models.Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_permissions(sender, **kwargs):
+    transaction.on_commit(permissions.invalidate)
+
+
+renditions.register(get_user_model(), "avatar", "avatar")
@@ -1,5 +1,6 @@
 import logging
 from django import template
+from core.utils import renditions
 from core.utils.decorator import _check_perms
 from django.apps import apps
 register = template.Library()
@@ -21,3 +22,13 @@ def get_model_name(_object):
     except Exception as e:
         logging.error(e)
         return "Unknown"
+
+
+@register.simple_tag
+def rendition(file, spec, size):
+    return renditions.get_url(file, spec, size)
+
+
+@register.simple_tag
+def srcset(file, spec, size=None):
+    return renditions.get_srcset(file, spec, size)
@@ -0,0 +1,393 @@
+import io
+import tempfile
+import uuid
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.base.mail import BaseEmailMessage
+from accounts import audit, models, outbox, views
+from accounts.invites import UserInviter
+
+EmailStatus = models.OutboxEmail.EmailStatus
+
+
+class UserLogsCursorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            email="cursor@example.com", password="x", name="Cursor"
+        )
+        models.UserLogs.objects.all().delete()
+        content_type = ContentType.objects.get_for_model(user)
+        now = timezone.now()
+        # Pairs of entries share a time so the pk has to break the ties.
+        models.UserLogs.objects.bulk_create([
+            models.UserLogs(
+                user=user, content_type=content_type, object_id=user.pk,
+                action=models.ADDITION, message=f"{index}",
+                action_time=now - timedelta(minutes=index // 2)
+            ) for index in range(9)
+        ])
+
+    def get_view(self):
+        view = views.UserLogsDataView()
+        view.can_delete = False
+        return view
+
+    def get_data(self, **params):
+        return self.get_view().get_data({"length": "3", **params})
+
+    def get_messages(self, data):
+        return [row["message"] for row in data["data"]]
+
+    def test_cursor_round_trip(self):
+        view = self.get_view()
+        obj = models.UserLogs.objects.order_by("-action_time", "-pk")[2]
+        seek = view.decode_cursor(view.encode_cursor(obj))
+        self.assertEqual(
+            list(models.UserLogs.objects.filter(seek).order_by(
+                "-action_time", "-pk"
+            )),
+            list(models.UserLogs.objects.order_by("-action_time", "-pk")[3:])
+        )
+
+    def test_cursor_pages_match_offset_pages(self):
+        pages = []
+        data = self.get_data()
+        while data["data"]:
+            pages.append(self.get_messages(data))
+            if "cursor" not in data:
+                break
+            data = self.get_data(cursor=data["cursor"])
+        offset_pages = [
+            self.get_messages(self.get_data(start=str(start)))
+            for start in range(0, 9, 3)
+        ]
+        self.assertEqual(pages, offset_pages)
+        self.assertEqual(sum(pages, []), list(
+            models.UserLogs.objects.order_by(
+                "-action_time", "-pk"
+            ).values_list("message", flat=True)
+        ))
+
+    def test_malformed_cursor_falls_back_to_offset(self):
+        expected = self.get_messages(self.get_data(start="3"))
+        for cursor in ("not base64!", "WyIxIl0=", "bnVsbA=="):
+            data = self.get_data(start="3", cursor=cursor)
+            self.assertEqual(self.get_messages(data), expected)
+
+    def test_no_cursor_for_other_orderings(self):
+        data = self.get_data(**{
+            "order[0][column]": "0", "order[0][dir]": "asc",
+            "columns[0][data]": "message",
+        })
+        self.assertNotIn("cursor", data)
+
+
+class LogWriterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="writer@example.com", password="x", name="Writer"
+        )
+
+    def test_failed_batch_keeps_valid_entries(self):
+        models.UserLogs.objects.all().delete()
+        writer = audit.LogWriter()
+        writer.pending = [
+            models.UserLogs(user=self.user, action=models.ADDITION),
+            models.UserLogs(user=self.user, action=None),
+            models.UserLogs(user=self.user, action=models.DELETION),
+        ]
+        with self.assertLogs(level="ERROR") as logs:
+            writer.flush()
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(writer.pending, [])
+        self.assertEqual(
+            sorted(models.UserLogs.objects.values_list("action", flat=True)),
+            [models.ADDITION, models.DELETION]
+        )
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise OSError("Connection refused")
+
+
+@override_settings(
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_DELAY=60,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+)
+class OutboxTests(TestCase):
+
+    def create_email(self, **kwargs):
+        return models.OutboxEmail.objects.create(
+            subject="Hello", body="Text", html="<p>Text</p>",
+            to=["to@example.com"], **kwargs
+        )
+
+    def test_enqueue_on_commit(self):
+        message = mail.EmailMultiAlternatives(
+            "Hello", "Text", to=["to@example.com"]
+        )
+        message.attach_alternative("<p>Text</p>", "text/html")
+        with self.captureOnCommitCallbacks(execute=True):
+            outbox.enqueue(message)
+            self.assertFalse(models.OutboxEmail.objects.exists())
+        email = models.OutboxEmail.objects.get()
+        self.assertEqual(
+            (email.body, email.html, email.to),
+            ("Text", "<p>Text</p>", ["to@example.com"])
+        )
+
+    def test_claim(self):
+        due = self.create_email()
+        self.create_email(next_attempt_at=timezone.now() + timedelta(1))
+        self.create_email(status=EmailStatus.SENT)
+        claimed = outbox.claim(10)
+        self.assertEqual([email.pk for email in claimed], [due.pk])
+        self.assertEqual(claimed[0].status, EmailStatus.SENDING)
+        self.assertIsNotNone(claimed[0].claimed_by)
+        self.assertEqual(outbox.claim(10), [])
+
+    def test_deliver(self):
+        self.create_email()
+        sent = outbox.deliver(outbox.claim(10), mail.get_connection())
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>Text</p>")
+        email = models.OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (EmailStatus.SENT, 1))
+        self.assertIsNotNone(email.sent_at)
+
+    def test_retry_then_fail(self):
+        self.create_email()
+        before = timezone.now()
+        with self.assertLogs(level="ERROR"):
+            sent = outbox.deliver(outbox.claim(10), FailingBackend())
+        self.assertEqual(sent, 0)
+        email = models.OutboxEmail.objects.get()
+        self.assertEqual(
+            (email.status, email.attempts, email.error),
+            (EmailStatus.QUEUED, 1, "Connection refused")
+        )
+        self.assertGreaterEqual(
+            email.next_attempt_at, before + timedelta(seconds=60)
+        )
+        # Not due before its retry delay.
+        self.assertEqual(outbox.claim(10), [])
+        email.next_attempt_at = timezone.now()
+        email.save()
+        with self.assertLogs(level="ERROR"):
+            outbox.deliver(outbox.claim(10), FailingBackend())
+        email.refresh_from_db()
+        self.assertEqual(
+            (email.status, email.attempts), (EmailStatus.FAILED, 2)
+        )
+        self.assertIsNone(email.claimed_by)
+
+    def test_retry_delay(self):
+        self.assertEqual(
+            [outbox.get_retry_delay(attempts) for attempts in (1, 2, 3)],
+            [60, 120, 240]
+        )
+        self.assertEqual(outbox.get_retry_delay(30), 24 * 60 * 60)
+
+    def test_release_stale_and_purge(self):
+        stale = self.create_email(status=EmailStatus.SENDING)
+        old = self.create_email(
+            status=EmailStatus.SENT, sent_at=timezone.now() - timedelta(8)
+        )
+        recent = self.create_email(
+            status=EmailStatus.SENT, sent_at=timezone.now()
+        )
+        models.OutboxEmail.objects.filter(pk=stale.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(outbox.release_stale(600), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, EmailStatus.QUEUED)
+        self.assertEqual(outbox.purge(7), 1)
+        self.assertFalse(models.OutboxEmail.objects.filter(pk=old.pk).exists())
+        self.assertTrue(
+            models.OutboxEmail.objects.filter(pk=recent.pk).exists()
+        )
+
+
+@override_settings(TEMPLATES=[{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "OPTIONS": {"loaders": [("django.template.loaders.locmem.Loader", {
+        "tests/cycle.html": (
+            "{% block subject %}{% cycle 'a' 'b' %} {{ name }}{% endblock %}"
+            "{% block text_body %}{{ site_name }}{% endblock %}"
+        ),
+    })]},
+}])
+class RenderManyTests(TestCase):
+
+    def test_messages_do_not_share_state(self):
+        messages = BaseEmailMessage.render_many(
+            [{"name": "Ann"}, {"name": "Bob", "site_name": "Bob's"}, {}],
+            template_name="tests/cycle.html"
+        )
+        self.assertEqual(
+            [(message.subject, message.body) for message in messages],
+            [("a Ann", ""), ("a Bob", "Bob&#x27;s"), ("a", "")]
+        )
+
+
+@override_settings(EMAIL_OUTBOX=False)
+class UserInviterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            email="Admin@example.com", password="x", name="Admin"
+        )
+        cls.group = models.Group.objects.create(name="Editors")
+
+    def run_invite(self, text, **kwargs):
+        return UserInviter(self.user, **kwargs).run(io.StringIO(text))
+
+    def test_invite(self):
+        result = self.run_invite(
+            "Email,Name,Groups,Staff\n"
+            "new@example.com,New,editors,yes\n"
+            "bad-email,,,\n"
+        )
+        self.assertEqual(result.invited, 1)
+        self.assertEqual([line[0] for line in result.errors], [3])
+        invited = get_user_model().objects.get(email="new@example.com")
+        self.assertFalse(invited.is_active)
+        self.assertTrue(invited.is_staff)
+        self.assertEqual(list(invited.groups.all()), [self.group])
+        self.assertTrue(models.UserToken.objects.filter(
+            user=invited, type=models.UserToken.TokenType.INVITE
+        ).exists())
+        self.assertEqual(mail.outbox[0].to, ["new@example.com"])
+
+    def test_duplicates_ignore_case(self):
+        result = self.run_invite(
+            "Email\n"
+            "ADMIN@example.com\n"
+            "Ann@example.com\n"
+            "ann@example.com\n"
+            "ANN@EXAMPLE.COM\n",
+            chunk_size=2
+        )
+        self.assertEqual(result.invited, 1)
+        self.assertEqual([line[0] for line in result.errors], [2, 4, 5])
+        self.assertEqual(
+            get_user_model().objects.filter(
+                email__iexact="ann@example.com"
+            ).count(), 1
+        )
+
+    def test_dry_run(self):
+        result = self.run_invite("Email\nnew@example.com\n", dry_run=True)
+        self.assertEqual((result.rows, result.invited), (1, 0))
+        self.assertFalse(
+            get_user_model().objects.filter(email="new@example.com").exists()
+        )
+        self.assertEqual(mail.outbox, [])
+
+    def test_command_links_to_the_site(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("Email\nnew@example.com\n")
+            file.flush()
+            call_command(
+                "invite_users", file.name, user=self.user.email,
+                domain="assets.example.com", stdout=io.StringIO()
+            )
+        token = models.UserToken.objects.get(user__email="new@example.com")
+        self.assertIn(
+            f"https://assets.example.com/account/set_password/{token.token}/",
+            mail.outbox[0].body
+        )
+
+
+class UserTokenTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.first = User.objects.create_user(
+            email="first@example.com", password="x", name="First"
+        )
+        cls.second = User.objects.create_user(
+            email="second@example.com", password="x", name="Second"
+        )
+
+    def make_token(self, user):
+        return models.UserToken.make_token(
+            user, models.UserToken.TokenType.INVITE
+        )
+
+    def test_make_token_retries_taken_tokens(self):
+        taken, _ = self.make_token(self.first)
+        fresh = uuid.uuid4()
+        with mock.patch(
+            "accounts.models.uuid.uuid4",
+            side_effect=[uuid.UUID(taken), fresh]
+        ):
+            token, user_token = self.make_token(self.second)
+        self.assertEqual(token, fresh.hex)
+        self.assertEqual(user_token.user, self.second)
+
+    def test_make_token_gives_up(self):
+        taken, _ = self.make_token(self.first)
+        with mock.patch(
+            "accounts.models.uuid.uuid4", return_value=uuid.UUID(taken)
+        ):
+            with self.assertRaises(IntegrityError):
+                self.make_token(self.second)
+        self.assertFalse(
+            models.UserToken.objects.filter(user=self.second).exists()
+        )
+
+    def test_make_token_for_a_user_with_a_token(self):
+        self.make_token(self.first)
+        with mock.patch(
+            "accounts.models.uuid.uuid4", wraps=uuid.uuid4
+        ) as uuid4:
+            with self.assertRaises(IntegrityError):
+                self.make_token(self.first)
+        # No other token is tried, the user is the conflict.
+        self.assertEqual(uuid4.call_count, 1)
+
+    def test_purge_expired(self):
+        self.make_token(self.first)
+        self.make_token(self.second)
+        User = get_user_model()
+        for index in range(5):
+            user = User.objects.create_user(
+                email=f"expired{index}@example.com", password="x"
+            )
+            self.make_token(user)
+        models.UserToken.objects.exclude(
+            user__in=[self.first, self.second]
+        ).update(expires=timezone.now() - timedelta(minutes=1))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                models.UserToken.purge_expired(chunk_size=2), 5
+            )
+        # One DELETE per chunk.
+        self.assertEqual(len([
+            query for query in queries
+            if query["sql"].startswith("DELETE")
+        ]), 3)
+        self.assertEqual(
+            set(models.UserToken.objects.values_list("user", flat=True)),
+            {self.first.pk, self.second.pk}
+        )
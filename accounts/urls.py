@@ -1,10 +1,20 @@
 from django.contrib.auth.views import PasswordResetView
-from django.urls import path, reverse_lazy
+from django.urls import path, re_path, reverse_lazy
 from accounts import views, forms
 
 
 urlpatterns = [
     path('login/', views.LoginView.as_view(), name='auth_login'),
+    path(
+        'register/',
+        views.RegistrationView.as_view(), name='registration_register'),
+    path(
+        'activate/resend/',
+        views.ResendActivationView.as_view(),
+        name='registration_resend_activation'),
+    re_path(
+        r'^activate/(?P<activation_key>[a-fA-F0-9]{64})/$',
+        views.ActivationView.as_view(), name='registration_activate'),
     path(
         'set_password/<token>/',
         views.UserInviteSetPassword.as_view(), name="set_password"),
@@ -36,6 +46,11 @@ urlpatterns = [
         views.UserGroupListView.as_view(),
         name="user_groups_list"
     ),
+    path(
+        'user-groups-list/export/',
+        views.UserGroupExportView.as_view(),
+        name="user_groups_export"
+    ),
     path(
         'user-groups-form/',
         views.UserGroupCreateView.as_view(),
@@ -52,8 +67,23 @@ urlpatterns = [
         name="user_groups_delete"
     ),
     path('user-list', views.UserListView.as_view(), name="user_list"),
+    path(
+        'user-list/data/',
+        views.UserListDataView.as_view(),
+        name="user_list_data"
+    ),
+    path(
+        'user-list/export/',
+        views.UserExportView.as_view(),
+        name="user_export"
+    ),
     path('user-create', views.UserCreateView.as_view(), name="user_create"),
     path('user-invite', views.UserInviteView.as_view(), name="user_invite"),
+    path(
+        'user-invite/bulk/',
+        views.UserBulkInviteView.as_view(),
+        name="user_invite_bulk"
+    ),
     path(
         'user-update/<pk>/',
         views.UserUpdateView.as_view(),
@@ -74,6 +104,11 @@ urlpatterns = [
         views.DesignationListView.as_view(),
         name="designation_list"
     ),
+    path(
+        'designation-list/export/',
+        views.DesignationExportView.as_view(),
+        name="designation_export"
+    ),
     path(
         'designation-form/',
         views.DesignationCreateView.as_view(),
@@ -90,5 +125,15 @@ urlpatterns = [
         name="designation_delete"
     ),
     path('user-logs/', views.UserLogsListView.as_view(), name="user_logs"),
+    path(
+        'user-logs/data/',
+        views.UserLogsDataView.as_view(),
+        name="user_logs_data"
+    ),
+    path(
+        'user-logs/export/',
+        views.UserLogsExportView.as_view(),
+        name="user_logs_export"
+    ),
     path('logout/', views.LogoutView.as_view(), name='auth_logout'),
 ]
@@ -1,3 +1,4 @@
+import csv
 from django.contrib.auth.views import (
     PasswordChangeView as DjangoPasswordChangeView
 )
@@ -7,14 +8,24 @@ from core.utils.utils import redirect_to_another_url
 from django.utils.decorators import method_decorator
 from django.views import generic
 from accounts import forms, models, email
+from accounts.invites import UserInviter
 from django.contrib import messages
 from django.urls import reverse_lazy
-from core.utils.decorator import CHANGE, VIEW, DELETE, ADD, perms_require
+from core.utils.decorator import (
+    CHANGE, VIEW, DELETE, ADD, EXPORT, perms_require
+)
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.contrib.auth import login
 from django.http import HttpResponseRedirect
 from accounts.decorators import login_required
+from accounts.templatetags.accounts import get_model_name
+from core.base.datatable import DataTableView, Column
+from core.base.export import ExportView
+from django.utils.timesince import timesince
+from configuration.cache import get_request_config
+from registration.backends.default import views as registration_views
+from dashboard.imports import open_upload
 
 
 class LoginView(auth_views.LoginView):
@@ -112,6 +123,18 @@ class UserGroupListView(generic.ListView):
     queryset = models.Group.objects.prefetch_related("permissions").all()
 
 
+@method_decorator([login_required(staff=True), perms_require((f"auth.{VIEW}group", f"accounts.{EXPORT}group"))], name="dispatch")  # noqa
+class UserGroupExportView(ExportView):
+    queryset = models.Group.objects.prefetch_related('permissions')
+    columns = [
+        Column('Name', field='name', searchable=True),
+        Column('Permissions', value=lambda obj: ", ".join(
+            permission.codename for permission in obj.permissions.all()
+        )),
+    ]
+    ordering = ('name', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"auth.{ADD}group")], name="dispatch")  # noqa
 class UserGroupCreateView(generic.FormView):
     template_name = "accounts/groups_form.html"
@@ -196,10 +219,41 @@ class UserListView(generic.TemplateView):
     template_name = "accounts/user_list.html"
     extra_context = {'segment': 'user', 'sub_segment': "user", "title": "User"}
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['object_list'] = models.Users.objects.all()
-        return context
+
+@method_decorator([login_required(staff=True), perms_require(f"accounts.{VIEW}users")], name="dispatch")  # noqa
+class UserListDataView(DataTableView):
+    queryset = models.Users.objects.select_related('designation')
+    columns = [
+        Column('name', searchable=True),
+        Column('email', searchable=True),
+        Column('phone', searchable=True),
+        Column('designation', field='designation__title', searchable=True),
+        Column(
+            'role', orderable=False,
+            value=lambda obj: {
+                'title': obj.role(), 'css_class': obj.bade_role()
+            }
+        ),
+        Column('is_active'),
+    ]
+    delete_permission = f"accounts.{DELETE}users"
+    query_budget = 7
+
+
+@method_decorator([perms_require(f"accounts.{EXPORT}users")], name="dispatch")  # noqa
+class UserExportView(ExportView, UserListDataView):
+    export_columns = [
+        Column('Name', field='name'),
+        Column('Email', field='email'),
+        Column('Phone', field='phone'),
+        Column('Address', field='address'),
+        Column('Designation', field='designation__title'),
+        Column('Role', value=lambda obj: obj.role()),
+        Column('Active', field='is_active'),
+        Column('Last Login', field='last_login'),
+        Column('Date Joined', field='date_joined'),
+    ]
+    ordering = ('name', 'pk')
 
 
 @method_decorator([login_required(staff=True), perms_require(f"accounts.{ADD}users")], name="dispatch")  # noqa
@@ -322,6 +376,33 @@ class UserInviteView(generic.FormView):
         return super().form_valid(form)
 
 
+@method_decorator([login_required(staff=True), perms_require(f"accounts.{ADD}users")], name="dispatch")  # noqa
+class UserBulkInviteView(generic.FormView):
+    template_name = "accounts/user_invite_bulk.html"
+    form_class = forms.UserBulkInviteForm
+    extra_context = {
+        'segment': 'user', 'sub_segment': "user", 'title': "Invite Users"
+    }
+
+    def form_valid(self, form):
+        inviter = UserInviter(
+            self.request.user, request=self.request,
+            dry_run=form.cleaned_data['dry_run']
+        )
+        try:
+            result = inviter.run(open_upload(form.cleaned_data['file']))
+        except (UnicodeDecodeError, csv.Error) as e:
+            form.add_error('file', f"The file is not a UTF-8 CSV file: {e}")
+            return self.form_invalid(form)
+        if result.invited:
+            messages.success(
+                self.request, f"{result.invited} users invited successfully!"
+            )
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result)
+        )
+
+
 class UserInviteSetPassword(generic.FormView):
     template_name = "accounts/set_password.html"
     form_class = forms.UserInviteSetPassword
@@ -387,6 +468,19 @@ class DesignationListView(generic.TemplateView):
         return context
 
 
+@method_decorator([login_required(staff=True), perms_require((f"accounts.{VIEW}designationmodel", f"accounts.{EXPORT}designation"))], name="dispatch")  # noqa
+class DesignationExportView(ExportView):
+    queryset = models.DesignationModel.objects.all()
+    columns = [
+        Column('Title', field='title', searchable=True),
+        Column('Description', field='description', searchable=True),
+        Column('Active', field='is_active'),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('title', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"accounts.{ADD}designationmodel")], name="dispatch")  # noqa
 class DesignationCreateView(generic.FormView):
     template_name = "accounts/designation_form.html"
@@ -474,15 +568,68 @@ class DesignationDeleteView(generic.View):
 
 
 @method_decorator([login_required(staff=True)], name="dispatch")  # noqa
-class UserLogsListView(generic.ListView):
+class UserLogsListView(generic.TemplateView):
     extra_context = {
         'segment': 'settings', 'sub_segment': "userlogs",
         "title": "User logs"
     }
+    template_name = "accounts/user_logs_list.html"
+    query_budget = 5
+
+
+@method_decorator([login_required(staff=True)], name="dispatch")  # noqa
+class UserLogsDataView(DataTableView):
     queryset = models.UserLogs.objects.select_related(
         "content_type", "user"
     )
-    template_name = "accounts/user_logs_list.html"
+    columns = [
+        Column(
+            'user', field='user__name', searchable=True,
+            value=lambda obj: str(obj.user)
+        ),
+        Column('action', value=lambda obj: obj.get_action_html()),
+        Column('table', orderable=False, value=get_model_name),
+        Column('message', searchable=True),
+        Column(
+            'action_time',
+            value=lambda obj: timesince(obj.action_time)
+        ),
+    ]
+    ordering = ("-action_time", "-pk")
+    cursor_fields = ("-action_time", "-pk")
+    query_budget = 7
+
+
+@method_decorator([perms_require(f"accounts.{EXPORT}login_logs")], name="dispatch")  # noqa
+class UserLogsExportView(ExportView, UserLogsDataView):
+    export_columns = [
+        Column('User', value=lambda obj: str(obj.user)),
+        Column('Action', value=lambda obj: obj.get_action_display()),
+        Column('Table', value=get_model_name),
+        Column('Object ID', field='object_id'),
+        Column('Message', field='message'),
+        Column('Action Time', field='action_time'),
+    ]
+
+
+class RegistrationView(registration_views.RegistrationView):
+    registration_profile = models.ActivationProfile
+
+    def dispatch(self, request, *args, **kwargs):
+        config = get_request_config(request)
+        self.SEND_ACTIVATION_EMAIL = config.send_activation_email
+        return super().dispatch(request, *args, **kwargs)
+
+    def registration_allowed(self):
+        return get_request_config(self.request).registration_open
+
+
+class ActivationView(registration_views.ActivationView):
+    registration_profile = models.ActivationProfile
+
+
+class ResendActivationView(registration_views.ResendActivationView):
+    registration_profile = models.ActivationProfile
 
 
 class LogoutView(auth_views.LogoutView):
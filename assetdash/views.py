@@ -51,7 +51,7 @@ class AssetRequestCreateView(generic.CreateView):
         form_obj = form.save(commit=False)
         form_obj.requested = self.request.user
         form_obj.request_date = timezone.now()
-        form_obj.save()
+        form_obj.save(changed_by=self.request.user)
         messages.success(self.request, "Asset Request created successfully")
         return super().form_valid(form)
 
@@ -0,0 +1,101 @@
+import logging
+import time
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from core.utils.cache import is_shared
+from . import models
+from .runtime import RuntimeConfig
+
+VERSION_KEY = "configuration:site:{}:version"
+_entries = {}
+
+
+class SiteBundle:
+    """ Per-process snapshot of a site and its settings rows. """
+    __slots__ = (
+        "version", "checked", "site", "general", "social", "auth", "config"
+    )
+
+    def __init__(self, version, site):
+        self.version = version
+        self.checked = time.monotonic()
+        self.site = site
+        self.general = getattr(site, "site_general", None)
+        self.social = getattr(site, "site_social", None)
+        self.auth = getattr(site, "site_auth", None)
+        self.config = RuntimeConfig.build(self.general, self.auth)
+
+
+def _ttl():
+    return getattr(settings, "SITE_SETTINGS_CACHE_TTL", 5)
+
+
+def _site_id(site):
+    return getattr(site, "pk", site)
+
+
+def _shared_version(site_id):
+    try:
+        return cache.get(VERSION_KEY.format(site_id)) or 0
+    except Exception as e:
+        logging.error(e)
+        return 0
+
+
+def _load(site_id, version):
+    site = models.Site.objects.select_related(
+        "site_general", "site_social", "site_auth"
+    ).filter(pk=site_id).first()
+    return SiteBundle(version, site)
+
+
+def get_bundle(site):
+    """ Return the cached bundle of ``site``, reloading it only when the
+        shared version key was bumped by another process. Without a shared
+        cache the other processes cannot bump it, the bundle is then
+        reloaded once it is ``SITE_SETTINGS_CACHE_TTL`` seconds old.
+    """
+    site_id = _site_id(site)
+    entry = _entries.get(site_id)
+    if entry is not None and time.monotonic() - entry.checked < _ttl():
+        return entry
+    version = _shared_version(site_id)
+    if entry is not None and entry.version == version and is_shared():
+        entry.checked = time.monotonic()
+        return entry
+    entry = _entries[site_id] = _load(site_id, version)
+    return entry
+
+
+def get_site_settings(site):
+    return get_bundle(site).general
+
+
+def get_auth_settings(site):
+    return get_bundle(site).auth
+
+
+def get_runtime_config(site):
+    return get_bundle(site).config
+
+
+def get_request_config(request):
+    """ Return the config attached by ``CustomAMSMiddleware``, loading it
+        for requests that did not go through the middleware.
+    """
+    config = getattr(request, "runtime_config", None)
+    if config is None:
+        config = get_runtime_config(get_current_site(request))
+    return config
+
+
+def invalidate(site):
+    site_id = _site_id(site)
+    _entries.pop(site_id, None)
+    key = VERSION_KEY.format(site_id)
+    try:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception as e:
+        logging.error(e)
@@ -28,7 +28,8 @@ class SiteSettingsModelForm(forms.ModelForm):
         model = models.SiteSettings
         fields = [
             'logo', 'favicon', 'timezone', 'color', 'display_name', "user_bar",
-            'domain_name', "under_construction", "message", "user_logs"
+            'domain_name', "under_construction", "message", "user_logs",
+            "user_logs_retention_days"
         ]
         widgets = {"message": forms.Textarea(attrs={'rows': 3})}
 
@@ -78,6 +79,7 @@ class SiteSettingsModelForm(forms.ModelForm):
                 ),
                 css_class='form-row'
             ),
+            'user_logs_retention_days',
             "under_construction",
             'message',
             get_button_update(
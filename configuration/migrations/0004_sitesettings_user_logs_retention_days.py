@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0003_alter_sitesettings_timezone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='user_logs_retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='users logs older than this are archived and removed by purge_user_logs, leave empty to keep them forever.', null=True, verbose_name='Users Logs Retention (days)'),
+        ),
+    ]
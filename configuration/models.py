@@ -37,6 +37,11 @@ class SiteSettings(BaseModel):
         help_text="users logs enable (only super user can view users logs).",
         verbose_name="Users Logs"
     )
+    user_logs_retention_days = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Users Logs Retention (days)",
+        help_text="users logs older than this are archived and removed by "
+                  "purge_user_logs, leave empty to keep them forever."
+    )
     message = models.TextField(null=True, blank=True)
 
     class Meta:
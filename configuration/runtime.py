@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """ Read-only view of the database backed site configuration.
+
+        Built once per settings version and shared by every request of the
+        process, so nothing needs to be written to ``django.conf.settings``.
+    """
+    time_zone: str
+    user_logs: bool
+    user_logs_retention_days: int
+    user_bar: bool
+    under_construction: bool
+    activation_days: int
+    registration_auto_login: bool
+    send_activation_email: bool
+    registration_open: bool
+    default_from_email: str
+
+    @classmethod
+    def build(cls, general=None, auth=None):
+        return cls(
+            time_zone=getattr(general, 'timezone', None) or settings.TIME_ZONE,
+            user_logs=getattr(general, 'user_logs', settings.USER_LOGS),
+            user_logs_retention_days=getattr(
+                general, 'user_logs_retention_days', None
+            ),
+            user_bar=getattr(general, 'user_bar', False),
+            under_construction=getattr(general, 'under_construction', False),
+            activation_days=getattr(
+                auth, 'activation_days', settings.ACCOUNT_ACTIVATION_DAYS
+            ),
+            registration_auto_login=getattr(
+                auth, 'registration_auto_login',
+                getattr(settings, 'REGISTRATION_AUTO_LOGIN', False)
+            ),
+            send_activation_email=getattr(
+                auth, 'send_activation_email',
+                getattr(settings, 'SEND_ACTIVATION_EMAIL', True)
+            ),
+            registration_open=getattr(
+                auth, 'registration_open',
+                getattr(settings, 'REGISTRATION_OPEN', True)
+            ),
+            default_from_email=settings.DEFAULT_FROM_EMAIL,
+        )
@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save
+from functools import partial
+from django.db import connections, transaction
+from django.db.models.signals import post_save, post_delete, post_migrate
 from django.dispatch import receiver
-from . import models
+from . import models, cache
 
 
 @receiver(post_save, sender=models.Site)
@@ -9,3 +11,39 @@ def create_object_link_site(sender, created, instance, **kwargs):
         models.SiteSettings.objects.create(site=instance)
         models.SocialSetting.objects.create(site=instance)
         models.AuthenticationSettings.objects.create(site=instance)
+
+
+@receiver(post_migrate)
+def create_missing_site_settings(sender, using, **kwargs):
+    # The default site is created by django.contrib.sites through the
+    # historical model, which does not reach create_object_link_site.
+    tables = connections[using].introspection.table_names()
+    if models.AuthenticationSettings._meta.db_table not in tables:
+        return
+    sites = models.Site.objects.using(using)
+    for model in (
+        models.SiteSettings, models.SocialSetting,
+        models.AuthenticationSettings
+    ):
+        model.objects.using(using).bulk_create([
+            model(site=site)
+            for site in sites.exclude(pk__in=model.objects.using(
+                using
+            ).values("site_id"))
+        ])
+
+
+@receiver(post_save, sender=models.SiteSettings)
+@receiver(post_delete, sender=models.SiteSettings)
+@receiver(post_save, sender=models.SocialSetting)
+@receiver(post_delete, sender=models.SocialSetting)
+@receiver(post_save, sender=models.AuthenticationSettings)
+@receiver(post_delete, sender=models.AuthenticationSettings)
+def invalidate_site_settings(sender, instance, **kwargs):
+    transaction.on_commit(partial(cache.invalidate, instance.site_id))
+
+
+@receiver(post_save, sender=models.Site)
+@receiver(post_delete, sender=models.Site)
+def invalidate_site(sender, instance, **kwargs):
+    transaction.on_commit(partial(cache.invalidate, instance.pk))
@@ -2,7 +2,6 @@ from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views import generic
-from core.middlewares import auth_config
 from core.utils.decorator import perms_require, CHANGE, VIEW
 from . import forms, models
 from django.contrib.sites.shortcuts import get_current_site
@@ -128,7 +127,6 @@ class AuthSettingsUpdateView(generic.UpdateView):
             self.request, form_obj, ac_models.CHANGE,
             changed_data=form.changed_data
         )
-        auth_config(get_current_site(self.request))
         return redirect(self.success_url)
 
     def get_form_kwargs(self):
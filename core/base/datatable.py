@@ -0,0 +1,227 @@
+import base64
+import json
+from functools import reduce
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import formats, timezone
+from django.utils.timesince import timesince
+from django.views import generic
+from core.utils.decorator import _check_perms
+from core.utils.queries import estimate_count
+
+
+def format_datetime(value, format="DATETIME_FORMAT"):
+    if not value:
+        return ""
+    return formats.date_format(timezone.localtime(value), format)
+
+
+def format_timesince(value):
+    if not value:
+        return ""
+    return f"{timesince(value)} ago"
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Column:
+    """ One column of a ``DataTableView``.
+
+        ``field`` is the ORM path used to order and search the column (the
+        column name by default), ``value`` an optional callable building the
+        JSON value of a row, otherwise ``field`` is resolved on the object.
+    """
+
+    def __init__(self, name, field=None, orderable=True, searchable=False,
+                 value=None):
+        self.name = name
+        self.field = field or name
+        self.orderable = orderable
+        self.searchable = searchable
+        self.value = value
+
+    def resolve(self, obj):
+        if self.value is not None:
+            return self.value(obj)
+        value = obj
+        for attr in self.field.split("__"):
+            try:
+                value = getattr(value, attr)
+            except ObjectDoesNotExist:
+                value = None
+            if value is None:
+                return None
+        return value
+
+    def get_value(self, obj):
+        value = self.resolve(obj)
+        if self.value is not None or isinstance(
+            value, (bool, int, float, str)
+        ):
+            return value
+        return "None" if value is None else str(value)
+
+
+class DataTableView(generic.View):
+    """ JSON endpoint speaking the DataTables server-side protocol.
+
+        Subclasses declare the ``queryset`` and ``columns``; searching,
+        ordering and offset pagination are done by the database and every
+        page is served with a constant number of queries, checked against
+        ``query_budget`` by ``core.middlewares.InstrumentationMiddleware``
+        when it is set.
+
+        Views setting ``cursor_fields`` (unique, non null ordering fields
+        backed by an index) return an opaque ``cursor`` with every full page;
+        sent back, it seeks the next page instead of scanning the offset.
+    """
+    queryset = None
+    columns = ()
+    ordering = ("pk",)
+    cursor_fields = None
+    default_length = 20
+    max_length = 100
+    query_budget = None
+    delete_permission = None
+
+    def get(self, request, *args, **kwargs):
+        self.can_delete = bool(self.delete_permission) and _check_perms(
+            request.user, self.delete_permission
+        )
+        return JsonResponse(self.get_data(request.GET))
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_data(self, params):
+        queryset = self.get_queryset()
+        total = filtered = estimate_count(queryset)
+        search = params.get("search[value]", "").strip()
+        if search:
+            queryset = self.filter_queryset(queryset, search)
+            filtered = queryset.count()
+        ordering = self.get_ordering(params)
+        queryset = queryset.order_by(*ordering)
+        self.keyset = bool(self.cursor_fields) and (
+            tuple(ordering) == tuple(self.cursor_fields)
+        )
+        objects = self.paginate_queryset(queryset, params)
+        data = {
+            "draw": _to_int(params.get("draw"), 0),
+            "recordsTotal": total,
+            "recordsFiltered": filtered,
+            "data": self.get_rows(objects),
+        }
+        if self.keyset and len(objects) == self.get_length(params):
+            data["cursor"] = self.encode_cursor(objects[-1])
+        return data
+
+    def get_search_filters(self, search):
+        return [
+            Q(**{f"{column.field}__icontains": search})
+            for column in self.columns if column.searchable
+        ]
+
+    def filter_queryset(self, queryset, search):
+        filters = self.get_search_filters(search)
+        if not filters:
+            return queryset
+        return queryset.filter(reduce(lambda a, b: a | b, filters))
+
+    def get_ordering(self, params):
+        columns = {column.name: column for column in self.columns}
+        ordering = []
+        index = 0
+        while f"order[{index}][column]" in params:
+            position = params.get(f"order[{index}][column]")
+            name = params.get(f"columns[{position}][data]")
+            column = columns.get(name)
+            if column is not None and column.orderable:
+                prefix = "-" if params.get(
+                    f"order[{index}][dir]"
+                ) == "desc" else ""
+                ordering.append(f"{prefix}{column.field}")
+            index += 1
+        ordered = {field.lstrip("-") for field in ordering}
+        return ordering + [
+            field for field in self.ordering
+            if field.lstrip("-") not in ordered
+        ]
+
+    def get_length(self, params):
+        length = _to_int(params.get("length"), self.default_length)
+        if not 0 < length <= self.max_length:
+            length = self.max_length
+        return length
+
+    def paginate_queryset(self, queryset, params):
+        length = self.get_length(params)
+        if self.keyset:
+            seek = self.decode_cursor(params.get("cursor"))
+            if seek is not None:
+                return list(queryset.filter(seek)[:length])
+        start = max(_to_int(params.get("start"), 0), 0)
+        return list(queryset[start:start + length])
+
+    def get_cursor_field(self, name):
+        opts = self.queryset.model._meta
+        name = name.lstrip("-")
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    def encode_cursor(self, obj):
+        values = [
+            self.get_cursor_field(name).value_to_string(obj)
+            for name in self.cursor_fields
+        ]
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode()
+        ).decode()
+
+    def decode_cursor(self, cursor):
+        """ Filter selecting the rows after ``cursor``, or None when the
+            cursor is missing or malformed.
+        """
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.cursor_fields):
+                return None
+            values = [
+                self.get_cursor_field(name).to_python(value)
+                for name, value in zip(self.cursor_fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            return None
+        return self.get_seek_filter(values)
+
+    def get_seek_filter(self, values):
+        # (a, b) < (x, y) is spelled a <= x AND (a < x OR (a = x AND b < y))
+        # so the database can bound the index scan on the leading column.
+        seek = Q()
+        equal = {}
+        for name, value in zip(self.cursor_fields, values):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            seek |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        first = self.cursor_fields[0]
+        lookup = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{lookup}": values[0]}) & seek
+
+    def get_rows(self, objects):
+        return [self.get_row(obj) for obj in objects]
+
+    def get_row(self, obj):
+        row = {column.name: column.get_value(obj) for column in self.columns}
+        if hasattr(obj, "get_absolute_url"):
+            row["update_url"] = str(obj.get_absolute_url())
+        if self.can_delete and hasattr(obj, "get_absolute_delete_url"):
+            row["delete_url"] = str(obj.get_absolute_delete_url())
+        return row
@@ -0,0 +1,108 @@
+import pytz
+from django.contrib.sites.models import Site
+from django.http import (
+    HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
+from django.utils import timezone
+from django.utils.text import slugify
+from configuration.cache import get_request_config, get_runtime_config
+from core.base.datatable import DataTableView
+from core.utils.export import FORMATS
+
+
+class ExportView(DataTableView):
+    """ Streams every row of a ``DataTableView`` as CSV, XLSX or JSON lines
+        (``?format=``), filtered by the table search (``?search=``).
+
+        Rows are read with ``iterator(chunk_size=...)`` and written as they
+        come, so memory stays flat whatever the size of the export.
+        ``export_columns`` default to ``columns``, their names are used as
+        headers.
+
+        POSTing the same parameters queues an ``ExportJob`` instead, built
+        by ``run_export_worker`` for the exports outliving a request.
+    """
+    export_columns = None
+    chunk_size = 2000
+    query_budget = None
+
+    def get_export_columns(self):
+        return self.export_columns or self.columns
+
+    def get_title(self):
+        return str(self.queryset.model._meta.verbose_name_plural)
+
+    def get_filename(self, format):
+        name = slugify(self.get_title())
+        return f"{name}-{timezone.localdate():%Y-%m-%d}.{format}"
+
+    def get_export_queryset(self, search=""):
+        queryset = self.get_queryset()
+        if search:
+            queryset = self.filter_queryset(queryset, search)
+        return queryset.order_by(*self.ordering)
+
+    def get_time_zone(self):
+        """ Site time zone of the exported dates. Streamed responses are
+            written once ``CustomAMSMiddleware`` deactivated it, so it is
+            resolved up front and passed along.
+        """
+        request = getattr(self, "request", None)
+        if request is not None:
+            config = get_request_config(request)
+        else:
+            config = get_runtime_config(Site.objects.get_current())
+        return pytz.timezone(config.time_zone)
+
+    def get_export_rows(self, queryset, tz=None):
+        columns = self.get_export_columns()
+        tz = tz or self.get_time_zone()
+        for obj in queryset.iterator(chunk_size=self.chunk_size):
+            # Columns formatting their dates read the active time zone.
+            with timezone.override(tz):
+                row = [column.resolve(obj) for column in columns]
+            yield row
+
+    def write(self, format, rows, tz=None):
+        """ Chunks of the ``format`` file holding ``rows``. """
+        return FORMATS[format][1](
+            [column.name for column in self.get_export_columns()], rows,
+            title=self.get_title(), tz=tz or self.get_time_zone()
+        )
+
+    def get_params(self, params):
+        format = params.get("format", "csv")
+        if format not in FORMATS:
+            return None, None
+        return format, params.get("search", "").strip()
+
+    def get(self, request, *args, **kwargs):
+        format, search = self.get_params(request.GET)
+        if format is None:
+            return HttpResponseBadRequest("Unknown export format.")
+        tz = self.get_time_zone()
+        response = StreamingHttpResponse(
+            self.write(format, self.get_export_rows(
+                self.get_export_queryset(search), tz
+            ), tz),
+            content_type=FORMATS[format][0]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.get_filename(format)}"'
+        )
+        return response
+
+    def post(self, request, *args, **kwargs):
+        from dashboard.models import ExportJob
+
+        format, search = self.get_params(request.POST)
+        if format is None:
+            return HttpResponseBadRequest("Unknown export format.")
+        job = ExportJob.objects.create(
+            user=request.user, export=request.resolver_match.url_name,
+            format=format, search=search[:255],
+            filename=self.get_filename(format)
+        )
+        return JsonResponse({
+            "id": str(job.pk), "url": str(ExportJob.list_url())
+        }, status=202)
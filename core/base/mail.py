@@ -1,10 +1,40 @@
+import threading
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.core import mail
 from django.template.context import make_context
 from django.template.loader import get_template
+from django.utils.autoreload import file_changed
 from django.views.generic.base import ContextMixin
 
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_compiled(template_name):
+    """ Loaded template ``template_name`` and its named top-level nodes,
+        parsed and indexed once per process.
+    """
+    compiled = _templates.get(template_name)
+    if compiled is None:
+        template = get_template(template_name)
+        nodes = {
+            node.name: node for node in template.template.nodelist
+            if getattr(node, "name", None)
+        }
+        compiled = template, nodes
+        with _templates_lock:
+            _templates[template_name] = compiled
+    return compiled
+
+
+def _reset_templates(sender, file_path, **kwargs):
+    # Development server: forget the templates when a file changes.
+    _templates.clear()
+
+
+file_changed.connect(_reset_templates)
+
 
 class BaseEmailMessage(mail.EmailMultiAlternatives, ContextMixin):
     _node_map = {
@@ -57,16 +87,71 @@ class BaseEmailMessage(mail.EmailMultiAlternatives, ContextMixin):
         return context
 
     def render(self):
+        template, nodes = get_compiled(self.template_name)
         context = make_context(self.get_context_data(), request=self.request)
-        template = get_template(self.template_name)
         with context.bind_template(template.template):
-            for node in template.template.nodelist:
-                self._process_node(node, context)
+            self._render_nodes(nodes, context)
         self._attach_body()
 
+    @classmethod
+    def render_many(cls, contexts, request=None, template_name=None):
+        """ One rendered message per context of ``contexts``.
+
+            The compiled template is bound once, running the context
+            processors and computing the site values a single time; every
+            message context is pushed on top of the shared one, with a
+            fresh render context so tag state such as ``{% cycle %}`` is
+            not carried over from the previous message.
+        """
+        messages = [
+            cls(request, context, template_name) for context in contexts
+        ]
+        if not messages:
+            return messages
+        template, nodes = get_compiled(messages[0].template_name)
+        base = cls(request, None, template_name).get_context_data()
+        context = make_context(base, request=request)
+        with context.bind_template(template.template):
+            for message in messages:
+                with context.push(message.context), (
+                    context.render_context.push()
+                ):
+                    message._render_nodes(nodes, context)
+                message._attach_body()
+        return messages
+
     def send(self, to, *args, **kwargs):
         self.render()
+        self._set_recipients(to, kwargs)
+
+        from accounts import outbox
+        if outbox.is_enabled():
+            outbox.enqueue(self)
+        else:
+            super(BaseEmailMessage, self).send(*args, **kwargs)
 
+    @classmethod
+    def send_many(cls, recipients, request=None, template_name=None,
+                  **kwargs):
+        """ Render with ``render_many`` and send one message per
+            ``(to, context)`` of ``recipients``, queued in one INSERT with
+            the outbox or sent over one connection otherwise.
+        """
+        recipients = list(recipients)
+        messages = cls.render_many(
+            [context for _, context in recipients], request, template_name
+        )
+        for message, (to, _) in zip(messages, recipients):
+            message._set_recipients(to, dict(kwargs))
+
+        from accounts import outbox
+        if outbox.is_enabled():
+            outbox.enqueue_many(messages)
+        elif messages:
+            mail.get_connection().send_messages(messages)
+        return messages
+
+    def _set_recipients(self, to, kwargs):
         self.to = to
         self.cc = kwargs.pop('cc', [])
         self.bcc = kwargs.pop('bcc', [])
@@ -75,12 +160,11 @@ class BaseEmailMessage(mail.EmailMultiAlternatives, ContextMixin):
             'from_email', settings.DEFAULT_FROM_EMAIL
         )
 
-        super(BaseEmailMessage, self).send(*args, **kwargs)
-
-    def _process_node(self, node, context):
-        attr = self._node_map.get(getattr(node, 'name', ''))
-        if attr is not None:
-            setattr(self, attr, node.render(context).strip())
+    def _render_nodes(self, nodes, context):
+        for name, attr in self._node_map.items():
+            node = nodes.get(name)
+            if node is not None:
+                setattr(self, attr, node.render(context).strip())
 
     def _attach_body(self):
         if self.body and self.html:
@@ -1,10 +1,11 @@
 from django.contrib.sites.shortcuts import get_current_site
-from configuration.models import SocialSetting, SiteSettings
+from configuration import cache
 
 
 def ams_context_processor(request):
-    _site = get_current_site(request)
-    site_social, _ = SocialSetting.objects.get_or_create(site=_site)
-    ams, _ = SiteSettings.objects.get_or_create(site=_site)
-    context = {"ams": ams, "site_social": site_social, "site": _site}
+    bundle = cache.get_bundle(get_current_site(request))
+    context = {
+        "ams": bundle.general, "site_social": bundle.social,
+        "site": bundle.site
+    }
     return context
@@ -1,13 +1,14 @@
-import os
+import time
 import pytz
-import logging
+from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.utils import timezone
-from django.conf import settings
-from configuration import models
+from configuration import cache
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from core import VERSION
+from core.utils.metrics import registry
+from core.utils.queries import check_query_budget, count_queries
 
 
 class CustomAMSMiddleware:
@@ -17,40 +18,76 @@ class CustomAMSMiddleware:
     def __call__(self, request):
         request.version = VERSION
         site = get_current_site(request)
-        general = models.SiteSettings.objects.filter(site=site).first()
-        if general:
-            request.user_bar = general.user_bar
-            if general.under_construction:
-                if not (request.path == reverse_lazy("construction") or
-                        request.path == reverse_lazy('auth_login') or
-                        request.user.is_superuser):
-                    return redirect('construction')
-        if not settings.EMAIL_HOST_PASSWORD:
-            try:
-                auth_config(site)
-            except Exception as e:
-                logging.error(e)
-        request.email = settings.DEFAULT_FROM_EMAIL or "None"
-        if general:
-            if general.timezone:
-                request.user_bar = general.user_bar
-                settings.TIME_ZONE = general.timezone
-                settings.USER_LOGS = general.user_logs or True
-            timezone.activate(
-                pytz.timezone(general.timezone or settings.TIME_ZONE)
+        config = cache.get_runtime_config(site)
+        request.runtime_config = config
+        request.user_bar = config.user_bar
+        if config.under_construction:
+            if not (request.path == reverse_lazy("construction") or
+                    request.path == reverse_lazy('auth_login') or
+                    request.user.is_superuser):
+                return redirect('construction')
+        request.email = config.default_from_email or "None"
+        timezone.activate(pytz.timezone(config.time_zone))
+        try:
+            return self.get_response(request)
+        finally:
+            timezone.deactivate()
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.template = 0.0
+        self.query_budget = None
+
+
+class InstrumentationMiddleware:
+    """ Records the queries, database time, template render time and latency
+        of every request by URL name, in ``core.utils.metrics.registry`` and
+        a ``Server-Timing`` header (``SERVER_TIMING``).
+
+        Views declare a ``query_budget`` (class attribute, or function
+        attribute) checked against the queries of the whole request. Template
+        time covers ``TemplateResponse`` rendering. Put it first in
+        MIDDLEWARE so the latency includes the other middlewares.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "SERVER_TIMING", True)
+
+    def __call__(self, request):
+        request.timings = timings = RequestTimings()
+        with count_queries() as counter:
+            response = self.get_response(request)
+        duration = time.perf_counter() - timings.started
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        within = check_query_budget(
+            view, counter.count, timings.query_budget
+        )
+        registry.observe(
+            view, duration, counter.count, counter.duration,
+            timings.template, over_budget=not within
+        )
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={counter.duration * 1000:.1f};'
+                f'desc="{counter.count} queries", '
+                f"tpl;dur={timings.template * 1000:.1f}, "
+                f"total;dur={duration * 1000:.1f}"
             )
-        else:
-            timezone.activate(pytz.timezone(settings.TIME_ZONE))
-        return self.get_response(request)
-
-
-def auth_config(site):
-    if getattr(settings, 'ACCOUNT_ACTIVATION_DAYS', None) is None:
-        _auth_config = models.AuthenticationSettings.objects.filter(
-            site=site
-        ).first()
-        if _auth_config:
-            settings.ACCOUNT_ACTIVATION_DAYS = _auth_config.activation_days
-            settings.REGISTRATION_AUTO_LOGIN = _auth_config.registration_auto_login  # noqa
-            settings.SEND_ACTIVATION_EMAIL = _auth_config.send_activation_email
-            settings.REGISTRATION_OPEN = _auth_config.registration_open
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+        request.timings.query_budget = getattr(view, "query_budget", None)
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.timings.template += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
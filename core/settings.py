@@ -56,6 +56,7 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # end crispy config
 
 MIDDLEWARE = [
+    'core.middlewares.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -190,6 +191,8 @@ AUTH_USER_MODEL = "accounts.Users"
 LOGIN_URL = reverse_lazy('auth_login')
 LOGIN_REDIRECT_URL = reverse_lazy('dashboard')
 USER_LOGS = True
+# Defaults only, the live values come from AuthenticationSettings.
+ACCOUNT_ACTIVATION_DAYS = 7
 # custom register form
 REGISTRATION_FORM = "accounts.forms.RegistrationForm"
 
@@ -204,4 +207,80 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
-EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS')
\ No newline at end of file
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS')
+# Seconds a worker trusts its cached site settings before checking the
+# shared version key for changes made by other workers.
+SITE_SETTINGS_CACHE_TTL = int(os.getenv('SITE_SETTINGS_CACHE_TTL', 5))
+
+# Site settings and permission changes reach the other worker processes
+# through version keys in the cache, which must then be shared: set
+# CACHE_URL (redis://host:6379/0) when running several workers. Without it
+# every process has its own memory cache, reloads the site settings every
+# SITE_SETTINGS_CACHE_TTL seconds and does not cache permissions.
+CACHE_URL = os.getenv('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+PERMISSIONS_CACHE_TTL = int(os.getenv('PERMISSIONS_CACHE_TTL', 5 * 60))
+
+# User logs are buffered in process and written in batches, disable
+# USER_LOGS_ASYNC to save every entry immediately (tests). Up to
+# USER_LOGS_BATCH_SIZE entries, or USER_LOGS_FLUSH_INTERVAL seconds of them,
+# are lost when a process is killed before flushing.
+USER_LOGS_ASYNC = os.getenv('USER_LOGS_ASYNC', 'True') == 'True'
+USER_LOGS_BATCH_SIZE = int(os.getenv('USER_LOGS_BATCH_SIZE', 100))
+USER_LOGS_FLUSH_INTERVAL = float(os.getenv('USER_LOGS_FLUSH_INTERVAL', 2))
+
+# Asset ids are reserved by blocks per process, ASSET_ID_CHECK_DIGIT appends
+# a Luhn digit to new ids and should not be changed once ids were issued.
+ASSET_ID_BLOCK_SIZE = int(os.getenv('ASSET_ID_BLOCK_SIZE', 20))
+ASSET_ID_CHECK_DIGIT = os.getenv('ASSET_ID_CHECK_DIGIT', 'False') == 'True'
+
+# Dashboard counters are cached, tables estimated over the threshold by
+# PostgreSQL are not counted exactly.
+DASHBOARD_COUNTERS_TTL = int(os.getenv('DASHBOARD_COUNTERS_TTL', 60))
+DASHBOARD_APPROXIMATE_COUNT_THRESHOLD = int(
+    os.getenv('DASHBOARD_APPROXIMATE_COUNT_THRESHOLD', 100000)
+)
+
+# Background exports are built by `manage.py run_export_worker` into
+# EXPORT_ROOT, kept out of MEDIA_ROOT so they are only served to their owner.
+EXPORT_ROOT = os.getenv('EXPORT_ROOT', str(BASE_DIR / 'exports'))
+EXPORT_JOB_PROGRESS_ROWS = int(os.getenv('EXPORT_JOB_PROGRESS_ROWS', 5000))
+EXPORT_JOB_RETENTION_DAYS = int(os.getenv('EXPORT_JOB_RETENTION_DAYS', 7))
+
+# Requests in use due back within ASSET_REQUEST_EXPIRING_DAYS are listed in
+# the expiring queue of the asset request list.
+ASSET_REQUEST_EXPIRING_DAYS = int(
+    os.getenv('ASSET_REQUEST_EXPIRING_DAYS', 7)
+)
+
+# InstrumentationMiddleware adds a Server-Timing header to every response
+# when SERVER_TIMING is set; /metrics/ is served to the METRICS_TOKEN bearer
+# or, without a token, to superusers. A view running over its query budget
+# logs a warning, or raises with QUERY_BUDGET_STRICT (meant for tests).
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True'
+
+# Emails are queued in the outbox and sent by `manage.py run_email_worker`;
+# with EMAIL_OUTBOX off they are sent during the request (EMAIL_BACKEND).
+EMAIL_OUTBOX = os.getenv('EMAIL_OUTBOX', 'True') == 'True'
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', 60))
+EMAIL_OUTBOX_RETENTION_DAYS = int(
+    os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', 30)
+)
+
+# Thumbnails of the avatars and asset images are generated in the background
+# once an upload commits (`manage.py build_renditions` backfills them) and
+# served under MEDIA_ROOT/renditions/. RENDITION_FORMAT is webp or jpeg.
+RENDITION_FORMAT = os.getenv('RENDITION_FORMAT', 'webp')
+RENDITION_QUALITY = int(os.getenv('RENDITION_QUALITY', 80))
+RENDITION_WORKERS = int(os.getenv('RENDITION_WORKERS', 2))
+RENDITIONS_ASYNC = os.getenv('RENDITIONS_ASYNC', 'True') == 'True'
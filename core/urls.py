@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView, TemplateView
+from core.utils.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -18,7 +19,8 @@ urlpatterns = [
             template_name='configuration/under_construction.html'
         ),
         name="construction"
-    )
+    ),
+    path('metrics/', metrics_view, name="metrics"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 if settings.DEBUG:
@@ -0,0 +1,13 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backends whose entries are only seen by the process that wrote them.
+LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias="default"):
+    """ Whether every worker process sees the ``alias`` cache, which the
+        version keys bumped on invalidation rely on.
+    """
+    return not isinstance(caches[alias], LOCAL_BACKENDS)
@@ -1,27 +1,48 @@
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import user_passes_test
+from core.utils.permissions import has_perms
 
 VIEW = "view_"
 CHANGE = "change_"
 DELETE = "delete_"
 ADD = "add_"
+EXPORT = "export_"
+PERMS_ATTR = "required_perms:"
 
 
 def perms_require(perm, login_url=None, raise_exception=True):
+    perms = (perm,) if isinstance(perm, str) else tuple(perm)
+
     def check_perms(user):
-        if isinstance(perm, str):
-            perms = (perm,)
-        else:
-            perms = perm
-        if user.has_perms(perms):
+        if has_perms(user, perms):
             return True
         if raise_exception:
             raise PermissionDenied
         return False
-    return user_passes_test(check_perms, login_url=login_url)
+
+    def decorator(view_func):
+        view = user_passes_test(check_perms, login_url=login_url)(view_func)
+        # One attribute per decorator: ``method_decorator`` copies them all
+        # onto ``dispatch``, those of the parent classes' one included.
+        setattr(view, f"{PERMS_ATTR}{','.join(perms)}", perms)
+        return view
+    return decorator
+
+
+def get_required_perms(view_func):
+    """ Permissions checked by the ``perms_require`` decorators of
+        ``view_func`` (or of the ``dispatch`` of a view class), for the jobs
+        acting for a user outside of a request.
+    """
+    if hasattr(view_func, "view_class"):
+        view_func = view_func.view_class.dispatch
+    return {
+        perm for name, perms in vars(view_func).items()
+        if name.startswith(PERMS_ATTR) for perm in perms
+    }
 
 
 def _check_perms(user, perm):
-    if user.has_perms([perm]):
+    if has_perms(user, [perm]):
         return True
     return False
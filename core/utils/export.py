@@ -0,0 +1,248 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+import os
+import re
+import zipfile
+from itertools import islice
+from xml.sax.saxutils import escape
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import http_date, quote_etag
+
+
+CHUNK_SIZE = 500
+INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def to_cell(value, tz=None):
+    """ Plain value written to an export for ``value``, aware datetimes
+        converted to ``tz`` (the active time zone by default).
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (bool, int, float, decimal.Decimal, str)):
+        return value
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value, tz)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def write_csv(header, rows, title=None, tz=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for chunk in _chunks(rows):
+        writer.writerows(
+            [to_cell(value, tz) for value in row] for row in chunk
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_jsonl(header, rows, title=None, tz=None):
+    for chunk in _chunks(rows):
+        yield "".join(
+            json.dumps(dict(zip(header, (
+                to_cell(value, tz) for value in row
+            ))), default=str) + "\n" for row in chunk
+        )
+
+
+class _ZipStream(io.RawIOBase):
+    """ Write-only file collecting what ``zipfile`` writes until it is
+        taken by the response.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_REL = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+)
+XLSX_PACKAGE = "http://schemas.openxmlformats.org/package/2006"
+XLSX_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        f'<Types xmlns="{XLSX_PACKAGE}/content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType='
+        '"application/vnd.openxmlformats-officedocument.spreadsheetml.'
+        'worksheet+xml"/></Types>'
+    ),
+    "_rels/.rels": (
+        f'<Relationships xmlns="{XLSX_PACKAGE}/relationships">'
+        f'<Relationship Id="rId1" Type="{XLSX_REL}/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        f'<Relationships xmlns="{XLSX_PACKAGE}/relationships">'
+        f'<Relationship Id="rId1" Type="{XLSX_REL}/worksheet" '
+        'Target="worksheets/sheet1.xml"/></Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value, tz=None):
+    value = to_cell(value, tz)
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return f"<c><v>{value}</v></c>"
+    value = escape(INVALID_XML.sub("", value))
+    return (
+        f'<c t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>'
+    )
+
+
+def _xlsx_row(row, tz=None):
+    return f"<row>{''.join(_xlsx_cell(value, tz) for value in row)}</row>"
+
+
+def write_xlsx(header, rows, title=None, tz=None):
+    """ Stream a single sheet workbook. Rows are written as inline strings
+        straight into the deflated zip, so memory does not grow with the
+        number of rows.
+    """
+    stream = _ZipStream()
+    sheet_name = escape(re.sub(r"[\[\]:*?/\\]", "", title or "")[:31])
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, XLSX_HEADER + content)
+        archive.writestr("xl/workbook.xml", (
+            f'{XLSX_HEADER}<workbook xmlns="{XLSX_NS}" xmlns:r="{XLSX_REL}">'
+            f'<sheets><sheet name="{sheet_name or "Sheet1"}" sheetId="1" '
+            f'r:id="rId1"/></sheets></workbook>'
+        ))
+        with archive.open(
+            "xl/worksheets/sheet1.xml", "w", force_zip64=True
+        ) as sheet:
+            sheet.write(
+                f'{XLSX_HEADER}<worksheet xmlns="{XLSX_NS}"><sheetData>'
+                f'{_xlsx_row(header)}'.encode()
+            )
+            for chunk in _chunks(rows):
+                sheet.write("".join(
+                    _xlsx_row(row, tz) for row in chunk
+                ).encode())
+                yield stream.take()
+            sheet.write(b"</sheetData></worksheet>")
+    yield stream.take()
+
+
+FORMATS = {
+    "csv": ("text/csv", write_csv),
+    "xlsx": (
+        "application/"
+        "vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        write_xlsx
+    ),
+    "jsonl": ("application/x-ndjson", write_jsonl),
+}
+
+
+def parse_range(header, size):
+    """ ``(start, end)`` byte positions (inclusive) of a single range
+        ``Range`` header, ``None`` when it should be ignored and ``False``
+        when it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # Suffix range, the last ``end`` bytes.
+        if not int(end):
+            return False
+        return max(0, size - int(end)), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+def _read_range(path, start, length, block_size=FileResponse.block_size):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def file_response(request, path, filename, content_type):
+    """ Serve the file at ``path`` as an attachment, honouring single
+        ``Range`` requests (and ``If-Range``) so interrupted downloads of
+        large exports can be resumed.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{size:x}")
+    byte_range = None
+    header = request.headers.get("Range")
+    if header and request.headers.get("If-Range", etag) in (
+        etag, http_date(stat.st_mtime)
+    ):
+        byte_range = parse_range(header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(
+            open(path, "rb"), as_attachment=True, filename=filename,
+            content_type=content_type
+        )
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1), status=206,
+            content_type=content_type
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}"'
+        )
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
@@ -0,0 +1,112 @@
+import hmac
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Upper bounds, in seconds, of the request duration histogram buckets.
+DURATION_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.seconds = 0.0
+        self.over_budget = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class Registry:
+    """ Per process totals of the requests of every URL name, rendered in
+        the Prometheus text format. Every worker process keeps its own
+        totals, the scraper sums them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(ViewMetrics)
+
+    def observe(self, view, seconds, queries, db_seconds, template_seconds,
+                over_budget=False):
+        with self.lock:
+            metrics = self.views[view]
+            metrics.requests += 1
+            metrics.queries += queries
+            metrics.db_seconds += db_seconds
+            metrics.template_seconds += template_seconds
+            metrics.seconds += seconds
+            metrics.over_budget += over_budget
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    metrics.buckets[index] += 1
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+    def render(self):
+        with self.lock:
+            views = sorted(self.views.items())
+            lines = []
+            for name, help, kind, get in (
+                ("requests_total", "Requests served.", "counter",
+                 lambda m: m.requests),
+                ("queries_total", "Database queries run.", "counter",
+                 lambda m: m.queries),
+                ("db_seconds_total", "Time spent in the database.",
+                 "counter", lambda m: m.db_seconds),
+                ("template_seconds_total", "Time spent rendering templates.",
+                 "counter", lambda m: m.template_seconds),
+                ("query_budget_exceeded_total",
+                 "Requests running more queries than the view budget.",
+                 "counter", lambda m: m.over_budget),
+            ):
+                lines.append(f"# HELP courier_{name} {help}")
+                lines.append(f"# TYPE courier_{name} {kind}")
+                lines.extend(
+                    f'courier_{name}{{view="{_escape(view)}"}} {get(metrics)}'
+                    for view, metrics in views
+                )
+            name = "courier_request_duration_seconds"
+            lines.append(f"# HELP {name} Request latency.")
+            lines.append(f"# TYPE {name} histogram")
+            for view, metrics in views:
+                label = f'view="{_escape(view)}"'
+                for bound, count in zip(DURATION_BUCKETS, metrics.buckets):
+                    lines.append(
+                        f'{name}_bucket{{{label},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'{name}_bucket{{{label},le="+Inf"}} {metrics.requests}'
+                )
+                lines.append(f"{name}_sum{{{label}}} {metrics.seconds}")
+                lines.append(f"{name}_count{{{label}}} {metrics.requests}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+
+def metrics_view(request):
+    """ Prometheus endpoint of ``registry``, for the bearer of
+        ``METRICS_TOKEN`` or, when it is not set, superusers.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        allowed = hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        )
+    else:
+        allowed = request.user.is_superuser
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
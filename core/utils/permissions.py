@@ -0,0 +1,81 @@
+import logging
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from core.utils.cache import is_shared
+
+
+VERSION_KEY = "permissions:version"
+PERMISSIONS_KEY = "permissions:{}:{}"
+
+
+def _version():
+    try:
+        return cache.get(VERSION_KEY) or 0
+    except Exception as e:
+        logging.error(e)
+        return 0
+
+
+def load_permissions(user):
+    """ ``app_label.codename`` of the user and group permissions of
+        ``user``, read with a single query.
+    """
+    fields = ("content_type__app_label", "codename")
+    own = Permission.objects.filter(user=user).order_by()
+    groups = Permission.objects.filter(group__user=user).order_by()
+    return frozenset(
+        f"{app_label}.{codename}"
+        for app_label, codename in own.values_list(*fields).union(
+            groups.values_list(*fields)
+        )
+    )
+
+
+def get_permissions(user):
+    """ Permission names of ``user``, memoized on the user object for the
+        request and shared between requests until ``invalidate`` is called.
+
+        Only a cache shared by every worker process is used: with a local one
+        the other processes would never see a revoked permission.
+    """
+    permissions = getattr(user, "_permissions_snapshot", None)
+    if permissions is not None:
+        return permissions
+    if not is_shared():
+        permissions = user._permissions_snapshot = load_permissions(user)
+        return permissions
+    key = PERMISSIONS_KEY.format(user.pk, _version())
+    try:
+        permissions = cache.get(key)
+    except Exception as e:
+        logging.error(e)
+    if permissions is None:
+        permissions = load_permissions(user)
+        try:
+            cache.set(key, permissions, getattr(
+                settings, "PERMISSIONS_CACHE_TTL", 5 * 60
+            ))
+        except Exception as e:
+            logging.error(e)
+    user._permissions_snapshot = permissions
+    return permissions
+
+
+def has_perms(user, perms):
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return set(perms) <= get_permissions(user)
+
+
+def invalidate():
+    """ Drop every cached snapshot, called when user or group permissions
+        change.
+    """
+    try:
+        if not cache.add(VERSION_KEY, 1, timeout=None):
+            cache.incr(VERSION_KEY)
+    except Exception as e:
+        logging.error(e)
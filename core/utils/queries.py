@@ -0,0 +1,98 @@
+import logging
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryCounter:
+    """ ``execute_wrapper`` counting the queries and the time spent in the
+        database, cheap enough to be used outside of DEBUG.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def count_queries(using=DEFAULT_DB_ALIAS):
+    counter = QueryCounter()
+    with connections[using].execute_wrapper(counter):
+        yield counter
+
+
+def check_query_budget(name, count, budget):
+    """ Whether ``count`` queries fit in ``budget``, logging a warning when
+        they do not; with ``QUERY_BUDGET_STRICT`` set (tests) an
+        AssertionError is raised instead.
+    """
+    if budget is None or count <= budget:
+        return True
+    message = f"{name} ran {count} queries, budget is {budget}."
+    if getattr(settings, "QUERY_BUDGET_STRICT", False):
+        raise AssertionError(message)
+    logging.warning(message)
+    return False
+
+
+# Planner estimate of the rows of a table. Partitioned tables have no
+# statistics of their own, their estimate is the sum of their partitions'.
+ESTIMATE_SQL = (
+    "(SELECT (CASE WHEN c.relkind = 'p' THEN ("
+    "SELECT COALESCE(SUM(GREATEST(p.reltuples, 0)), 0) FROM pg_inherits i "
+    "JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid"
+    ") ELSE c.reltuples END)::bigint FROM pg_class c "
+    "WHERE c.oid = %s::regclass)"
+)
+
+
+def estimate_count(queryset, threshold=100000):
+    """ Row count of ``queryset``, read from the PostgreSQL planner
+        statistics for unfiltered querysets over ``threshold`` rows.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {ESTIMATE_SQL}", [
+                connection.ops.quote_name(queryset.model._meta.db_table)
+            ])
+            row = cursor.fetchone()
+        if row and row[0] >= threshold:
+            return row[0]
+    return queryset.count()
+
+
+def count_tables(models, threshold=None, using=DEFAULT_DB_ALIAS):
+    """ Row counts of ``models`` fetched with a single query, as a list.
+
+        On PostgreSQL the planner estimate is used for tables estimated over
+        ``threshold`` rows, when it is given.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    columns = []
+    params = []
+    for model in models:
+        table = qn(model._meta.db_table)
+        count = f"(SELECT COUNT(*) FROM {table})"
+        if threshold is not None and connection.vendor == "postgresql":
+            count = (
+                f"CASE WHEN {ESTIMATE_SQL} >= %s THEN {ESTIMATE_SQL} "
+                f"ELSE {count} END"
+            )
+            params += [table, threshold, table]
+        columns.append(count)
+    if not columns:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        return list(cursor.fetchone())
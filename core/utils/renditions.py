@@ -0,0 +1,244 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from PIL import Image, ImageOps, features
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+from django_cleanup.signals import cleanup_post_delete
+
+READY_KEY = "rendition:{}"
+# Seconds a missing rendition is remembered before storage is checked again.
+MISSING_TIMEOUT = 60
+
+
+class Spec:
+    """ Fixed widths the images of a field are resized to. ``crop`` ones are
+        cut to squares, the others keep their aspect ratio. Images are never
+        enlarged.
+    """
+
+    def __init__(self, name, sizes, crop=False):
+        self.name = name
+        self.sizes = tuple(sorted(sizes))
+        self.crop = crop
+
+    def get_size(self, size):
+        """ The smallest of ``sizes`` at least ``size`` pixels wide. """
+        return next((s for s in self.sizes if s >= size), self.sizes[-1])
+
+
+SPECS = {
+    # 40px and 64px circles and the 120px profile picture, at 1x and 2x.
+    "avatar": Spec("avatar", (40, 64, 80, 128, 256), crop=True),
+    "asset": Spec("asset", (160, 320, 640, 1280)),
+}
+
+# {model: {field name: Spec}} of the fields registered with ``register``.
+fields = {}
+
+
+def get_format():
+    if getattr(settings, "RENDITION_FORMAT", "webp") == "webp" and (
+        features.check("webp")
+    ):
+        return "WEBP", "webp"
+    return "JPEG", "jpg"
+
+
+def get_name(name, spec, size):
+    """ Storage name of the ``size`` rendition of the file ``name``. """
+    return f"renditions/{name}/{spec.name}-{size}.{get_format()[1]}"
+
+
+def get_key(name, spec):
+    return READY_KEY.format(
+        hashlib.md5(f"{spec.name}:{name}".encode()).hexdigest()
+    )
+
+
+def is_ready(file, spec):
+    """ Whether the renditions of ``file`` were generated, checked once per
+        process and cached.
+    """
+    key = get_key(file.name, spec)
+    ready = cache.get(key)
+    if ready is None:
+        ready = file.storage.exists(get_name(file.name, spec, spec.sizes[-1]))
+        cache.set(key, ready, None if ready else MISSING_TIMEOUT)
+    return ready
+
+
+def get_spec(spec):
+    return SPECS[spec] if isinstance(spec, str) else spec
+
+
+def get_url(file, spec, size):
+    """ URL of the smallest rendition of ``file`` at least ``size`` pixels
+        wide, or of ``file`` itself until its renditions are generated.
+    """
+    if not file:
+        return ""
+    spec = get_spec(spec)
+    if not is_ready(file, spec):
+        return file.url
+    return file.storage.url(get_name(file.name, spec, spec.get_size(size)))
+
+
+def get_srcset(file, spec, size=None):
+    """ ``srcset`` of ``file``: 1x and 2x candidates for an image shown
+        ``size`` pixels wide, every width of ``spec`` otherwise. Empty until
+        the renditions are generated.
+    """
+    spec = get_spec(spec)
+    if not file or not is_ready(file, spec):
+        return ""
+    if size:
+        return ", ".join(
+            f"{get_url(file, spec, size * density)} {density}x"
+            for density in (1, 2)
+        )
+    return ", ".join(
+        f"{file.storage.url(get_name(file.name, spec, width))} {width}w"
+        for width in spec.sizes
+    )
+
+
+def resize(image, spec, size):
+    if spec.crop:
+        side = min(image.size)
+        left = (image.width - side) // 2
+        top = (image.height - side) // 2
+        image = image.crop((left, top, left + side, top + side))
+        target = (min(size, side), min(size, side))
+    else:
+        width = min(size, image.width)
+        target = (width, max(1, round(image.height * width / image.width)))
+    if target == image.size:
+        return image
+    return image.resize(
+        target, Image.Resampling.LANCZOS, reducing_gap=3.0
+    )
+
+
+def convert(image, format):
+    alpha = image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+    if format == "WEBP":
+        return image.convert("RGBA" if alpha else "RGB")
+    if alpha:
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA"))
+        return background
+    return image.convert("RGB")
+
+
+def generate(storage, name, spec, force=False):
+    """ Write the renditions of the ``storage`` file ``name``, skipped when
+        they exist unless ``force`` is set. Returns the number written.
+    """
+    spec = get_spec(spec)
+    format, _ = get_format()
+    largest = get_name(name, spec, spec.sizes[-1])
+    if not force and storage.exists(largest):
+        cache.set(get_key(name, spec), True, None)
+        return 0
+    quality = getattr(settings, "RENDITION_QUALITY", 80)
+    with storage.open(name) as source, Image.open(source) as image:
+        # JPEGs are decoded at the smallest scale still covering every size.
+        image.draft("RGB", (spec.sizes[-1], spec.sizes[-1]))
+        image = convert(ImageOps.exif_transpose(image), format)
+        # The largest goes last: its presence marks the set complete.
+        for size in spec.sizes:
+            buffer = BytesIO()
+            resize(image, spec, size).save(
+                buffer, format=format, quality=quality, optimize=True
+            )
+            rendition = get_name(name, spec, size)
+            storage.delete(rendition)
+            storage.save(rendition, ContentFile(buffer.getvalue()))
+    cache.set(get_key(name, spec), True, None)
+    return len(spec.sizes)
+
+
+def delete(storage, name, spec):
+    spec = get_spec(spec)
+    for size in spec.sizes:
+        storage.delete(get_name(name, spec, size))
+    cache.delete(get_key(name, spec))
+
+
+class Renderer:
+    """ Generates renditions on a small thread pool once the transaction
+        saving their file commits, keeping Pillow off the request thread.
+        With ``RENDITIONS_ASYNC`` disabled they are generated on commit, in
+        the saving thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def schedule(self, storage, name, spec):
+        transaction.on_commit(lambda: self.submit(storage, name, spec))
+
+    def submit(self, storage, name, spec):
+        if not getattr(settings, "RENDITIONS_ASYNC", True):
+            self.run(storage, name, spec)
+            return
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "RENDITION_WORKERS", 2),
+                    thread_name_prefix="renditions",
+                )
+        self.executor.submit(self.run, storage, name, spec)
+
+    @staticmethod
+    def run(storage, name, spec):
+        try:
+            generate(storage, name, spec)
+        except Exception as e:
+            logging.error(e)
+
+
+renderer = Renderer()
+
+
+def register(model, field_name, spec):
+    """ Generate the ``spec`` renditions of the ``model`` image field
+        ``field_name`` whenever a file is saved into it.
+    """
+    fields.setdefault(model, {})[field_name] = get_spec(spec)
+    post_save.connect(
+        schedule_renditions, sender=model, dispatch_uid=f"renditions:{model}"
+    )
+
+
+def schedule_renditions(sender, instance, update_fields=None, **kwargs):
+    for field_name, spec in fields.get(sender, {}).items():
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        file = getattr(instance, field_name)
+        if file:
+            renderer.schedule(file.storage, file.name, spec)
+
+
+def delete_renditions(sender, file, field_name, file_name, success=True,
+                      **kwargs):
+    # django_cleanup removed the file of a registered field, replaced or
+    # with its instance deleted.
+    spec = fields.get(sender, {}).get(field_name)
+    if spec and success:
+        try:
+            delete(file.storage, file_name, spec)
+        except Exception as e:
+            logging.error(e)
+
+
+cleanup_post_delete.connect(delete_renditions, dispatch_uid="renditions")
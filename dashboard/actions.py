@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.utils import timezone
+from accounts import models as ac_models
+from dashboard import models, rollups
+
+
+@transaction.atomic
+def apply_bulk_action(request, ids, action):
+    """ Apply the ``AssetRequest.BULK_ACTIONS`` entry ``action`` to the
+        requests ``ids``, returning the ones it changed.
+
+        Requests whose status cannot move to the action's one, or without
+        asset for an approval, are filtered out by the WHERE clause of the
+        statements themselves: the matching rows are locked, then changed
+        with a single UPDATE also setting ``approved_by``. The transitions,
+        rollups and user logs of the changed rows are written in bulk in the
+        same transaction.
+    """
+    status = models.AssetRequest.BULK_ACTIONS[action]
+    matching = models.AssetRequest.objects.filter(
+        pk__in=ids, status__in=models.AssetRequest.get_sources(status)
+    )
+    if status == models.AssetRequest.RequestStatus.APPROVED:
+        # As in AssetRequestModelForm, only requests with an asset.
+        matching = matching.filter(asset__isnull=False)
+    changed = list(matching.select_related(
+        "asset", "requested"
+    ).select_for_update(of=("self",)))
+    if not changed:
+        return changed
+    now = timezone.now()
+    matching.filter(pk__in=[obj.pk for obj in changed]).update(
+        status=status, approved_by=request.user, status_changed_at=now,
+        updated_at=now
+    )
+    moves = []
+    transitions = []
+    for obj in changed:
+        moves.append((rollups.get_key(obj), -1))
+        transitions.append(models.AssetRequestTransition(
+            request=obj, source=obj.status, target=status,
+            changed_by=request.user, created_at=now
+        ))
+        obj.status = obj._loaded_status = status
+        obj.approved_by = request.user
+        obj.status_changed_at = now
+        moves.append((rollups.get_key(obj), 1))
+        obj._rollup_key = rollups.get_key(obj)
+    models.AssetRequestTransition.objects.bulk_create(transitions)
+    rollups.apply_many(moves)
+    ac_models.UserLogs.create_logs(
+        request, changed, ac_models.CHANGE,
+        changed_data=["status", "approved_by"]
+    )
+    return changed
@@ -0,0 +1,139 @@
+import re
+import threading
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+def check_digit(number):
+    """ Luhn check digit of ``number``. """
+    total = 0
+    for position, digit in enumerate(reversed(str(number))):
+        digit = int(digit)
+        if position % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return (10 - total % 10) % 10
+
+
+class AssetIdAllocator:
+    """ Hands out ``AST-`` asset ids from ``AssetSequence``.
+
+        Every process reserves blocks of ``ASSET_ID_BLOCK_SIZE`` numbers with
+        a single UPDATE of the counter row and serves ids from memory until
+        the block is used up, so allocating never retries or scans assets.
+        Numbers skipped by a restart are simply never issued.
+    """
+    prefix = "AST-"
+    first_number = 1000000
+
+    def __init__(self, name="asset"):
+        self.name = name
+        self.lock = threading.Lock()
+        self.next = self.end = 0
+
+    @property
+    def block_size(self):
+        return getattr(settings, "ASSET_ID_BLOCK_SIZE", 20)
+
+    def format(self, number):
+        if getattr(settings, "ASSET_ID_CHECK_DIGIT", False):
+            return f"{self.prefix}{number}{check_digit(number)}"
+        return f"{self.prefix}{number}"
+
+    def parse(self, asset_id):
+        """ Number ``asset_id`` was formatted from, or None when the
+            allocator cannot issue it.
+        """
+        match = re.match(rf"^{re.escape(self.prefix)}(\d+)$", asset_id)
+        if match is None:
+            return None
+        digits = match.group(1)
+        if getattr(settings, "ASSET_ID_CHECK_DIGIT", False):
+            if len(digits) < 2 or (
+                check_digit(digits[:-1]) != int(digits[-1])
+            ):
+                return None
+            digits = digits[:-1]
+        return int(digits)
+
+    def advance(self, asset_ids):
+        """ Move the sequence past the numbers of ``asset_ids`` saved without
+            being allocated (imported), so they are never issued again.
+            Numbers of blocks other processes already reserved are not
+            checked.
+        """
+        from dashboard.models import AssetSequence
+
+        numbers = [
+            number for number in map(self.parse, asset_ids)
+            if number is not None
+        ]
+        if not numbers:
+            return
+        AssetSequence.objects.filter(name=self.name).update(
+            next_value=Greatest(F("next_value"), max(numbers) + 1)
+        )
+        with self.lock:
+            if any(self.next <= number < self.end for number in numbers):
+                self.next = self.end = 0
+
+    def allocate(self, count=1):
+        """ Return ``count`` unused asset ids. """
+        numbers = []
+        with self.lock:
+            taken = min(count, self.end - self.next)
+            numbers.extend(range(self.next, self.next + taken))
+            self.next += taken
+            missing = count - taken
+            if missing:
+                # A block reserved inside a transaction that rolls back
+                # would be handed out again, so only keep it in autocommit.
+                keep = not connection.in_atomic_block
+                size = max(missing, self.block_size) if keep else missing
+                start, end = self.reserve(size)
+                numbers.extend(range(start, start + missing))
+                if keep:
+                    self.next, self.end = start + missing, end
+        return [self.format(number) for number in numbers]
+
+    def reserve(self, count):
+        """ Reserve ``count`` numbers, returned as a ``(start, end)`` range.
+        """
+        from dashboard.models import AssetSequence
+
+        sequence = AssetSequence.objects.filter(name=self.name)
+        with transaction.atomic():
+            if not sequence.update(next_value=F("next_value") + count):
+                try:
+                    with transaction.atomic():
+                        AssetSequence.objects.create(
+                            name=self.name,
+                            next_value=self.initial_number() + count
+                        )
+                except IntegrityError:
+                    sequence.update(next_value=F("next_value") + count)
+            end = sequence.values_list("next_value", flat=True).get()
+        return end - count, end
+
+    def initial_number(self):
+        """ First number of a new sequence, past the ids issued before it
+            existed.
+        """
+        from dashboard.models import AssetModel
+
+        pattern = re.compile(rf"^{re.escape(self.prefix)}(\d+)$")
+        last = self.first_number - 1
+        for asset_id in AssetModel.objects.filter(
+            asset_id__startswith=self.prefix
+        ).values_list("asset_id", flat=True).iterator():
+            match = pattern.match(asset_id)
+            if match:
+                last = max(last, int(match.group(1)))
+        return last + 1
+
+
+asset_ids = AssetIdAllocator()
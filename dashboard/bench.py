@@ -0,0 +1,391 @@
+import math
+import random
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from importlib import import_module
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import URLPattern, URLResolver, Resolver404, resolve, reverse
+from django.utils import timezone
+from accounts import models as ac_models
+from core.utils.queries import count_queries
+from dashboard import counters, models, rollups
+
+URL_MODULES = ("dashboard.urls", "accounts.urls", "assetdash.urls")
+# URL names skipped by default: GET deletes and logs out in this project and
+# the exports read every row of their table.
+EXCLUDE = r"_delete$|^account_delete$|^auth_logout$|_cancel$|_export$"
+WORDS = (
+    "Laptop", "Monitor", "Desk", "Chair", "Phone", "Tablet", "Printer",
+    "Router", "Switch", "Projector", "Camera", "Scanner", "Server", "Dock",
+)
+REQUEST_STATUSES = (
+    (models.AssetRequest.RequestStatus.PENDING, 15),
+    (models.AssetRequest.RequestStatus.PROGRESS, 5),
+    (models.AssetRequest.RequestStatus.REJECTED, 10),
+    (models.AssetRequest.RequestStatus.APPROVED, 10),
+    (models.AssetRequest.RequestStatus.IN_USE, 30),
+    (models.AssetRequest.RequestStatus.RETURN, 10),
+    (models.AssetRequest.RequestStatus.AVAILABLE, 15),
+    (models.AssetRequest.RequestStatus.DAMAGE, 3),
+    (models.AssetRequest.RequestStatus.EXPIRED, 2),
+)
+
+
+@contextmanager
+def manual_timestamps(*model_classes):
+    """ Let ``bulk_create`` keep the given ``auto_now(_add)`` values, so the
+        generated rows are spread over time.
+    """
+    fields = [
+        field for model in model_classes
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Seeder:
+    """ Adds a synthetic asset management workload, ``batch_size`` rows per
+        INSERT and transaction. ``seed`` makes the data reproducible.
+    """
+
+    def __init__(self, batch_size=5000, seed=0, log=None):
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def run(self, users, groups, assets, requests, logs):
+        self.seed_lookups()
+        self.seed_users(users, groups)
+        self.seed_assets(assets)
+        self.seed_requests(requests)
+        self.seed_logs(logs)
+        rollups.rebuild()
+        counters.invalidate()
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def past(self, days):
+        return self.now - timezone.timedelta(
+            seconds=self.random.randrange(days * 86400)
+        )
+
+    def get_or_create(self, model, titles, **fields):
+        model.objects.bulk_create(
+            [model(title=title, **fields) for title in titles],
+            ignore_conflicts=True
+        )
+        return list(model.objects.filter(title__in=titles).values_list(
+            "pk", flat=True
+        ))
+
+    def seed_lookups(self):
+        self.statuses = self.get_or_create(
+            models.AssetStatusModel,
+            ["Available", "In Use", "In Repair", "Retired"]
+        )
+        self.categories = self.get_or_create(
+            models.CategoryModel, [f"Category {i}" for i in range(40)]
+        )
+        self.departments = self.get_or_create(
+            models.DepartmentModel, [f"Department {i}" for i in range(25)]
+        )
+        self.suppliers = self.get_or_create(
+            models.SupplierModel, [f"Supplier {i}" for i in range(200)]
+        )
+        self.designations = self.get_or_create(
+            ac_models.DesignationModel, [f"Designation {i}" for i in range(20)]
+        )
+
+    def seed_users(self, total, groups):
+        group_names = [f"Group {i}" for i in range(groups)]
+        ac_models.Group.objects.bulk_create(
+            [ac_models.Group(name=name) for name in group_names],
+            ignore_conflicts=True
+        )
+        group_ids = list(ac_models.Group.objects.filter(
+            name__in=group_names
+        ).values_list("pk", flat=True))
+        password = make_password("bench")
+        User = get_user_model()
+        Membership = User.groups.through
+        start = User.objects.count()
+        for offset, size in self.batches(total):
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        email=f"bench{start + offset + i}@example.com",
+                        name=f"Bench User {start + offset + i}",
+                        password=password,
+                        is_staff=self.random.random() < 0.1,
+                        designation_id=self.random.choice(self.designations),
+                        date_joined=self.past(730),
+                    ) for i in range(size)
+                ])
+                if group_ids:
+                    Membership.objects.bulk_create([
+                        Membership(users_id=user.pk, group_id=group)
+                        for user in users
+                        for group in self.random.sample(
+                            group_ids, min(len(group_ids), 2)
+                        )
+                    ])
+            self.log(f"users: {offset + size}/{total}")
+        self.users = list(User.objects.values_list("pk", flat=True))
+
+    def seed_assets(self, total):
+        Category = models.AssetModel.category.through
+        Department = models.AssetModel.department.through
+        for offset, size in self.batches(total):
+            asset_ids = models.AssetModel.get_asset_ids(size)
+            assets = []
+            for asset_id in asset_ids:
+                created = self.past(730)
+                assets.append(models.AssetModel(
+                    asset_id=asset_id,
+                    title=f"{self.random.choice(WORDS)} {asset_id}",
+                    model=f"M-{self.random.randrange(1000)}",
+                    price=self.random.randrange(10, 30000),
+                    asset_status_id=self.random.choice(self.statuses),
+                    supplier_id=self.random.choice(self.suppliers),
+                    is_active=self.random.random() < 0.95,
+                    added_by_id=self.random.choice(self.users),
+                    created_at=created, updated_at=created,
+                ))
+            with transaction.atomic(), manual_timestamps(models.AssetModel):
+                models.AssetModel.objects.bulk_create(assets)
+                Category.objects.bulk_create([
+                    Category(assetmodel_id=asset.pk, categorymodel_id=pk)
+                    for asset in assets
+                    for pk in self.random.sample(
+                        self.categories, self.random.randint(1, 3)
+                    )
+                ])
+                Department.objects.bulk_create([
+                    Department(assetmodel_id=asset.pk, departmentmodel_id=pk)
+                    for asset in assets
+                    for pk in self.random.sample(
+                        self.departments, self.random.randint(1, 2)
+                    )
+                ])
+            self.log(f"assets: {offset + size}/{total}")
+        self.assets = list(
+            models.AssetModel.objects.values_list("pk", flat=True)
+        )
+
+    def seed_requests(self, total):
+        statuses, weights = zip(*REQUEST_STATUSES)
+        in_use = models.AssetRequest.RequestStatus.IN_USE
+        for offset, size in self.batches(total):
+            requests = []
+            for status in self.random.choices(statuses, weights, k=size):
+                created = self.past(365)
+                pending = status in models.AssetRequest.PENDING_STATUSES
+                requests.append(models.AssetRequest(
+                    asset_id=self.random.choice(self.assets),
+                    requested_id=self.random.choice(self.users),
+                    approved_by_id=None if pending else self.random.choice(
+                        self.users
+                    ),
+                    details="Needed for a project.",
+                    status=status,
+                    request_date=created,
+                    due_date=self.now + timezone.timedelta(
+                        days=self.random.randint(-30, 60)
+                    ) if status == in_use else None,
+                    status_changed_at=created,
+                    created_at=created, updated_at=created,
+                ))
+            with transaction.atomic(), manual_timestamps(models.AssetRequest):
+                models.AssetRequest.objects.bulk_create(requests)
+            self.log(f"asset requests: {offset + size}/{total}")
+
+    def seed_logs(self, total):
+        content_type = ContentType.objects.get_for_model(models.AssetModel)
+        actions = (ac_models.ADDITION, ac_models.CHANGE, ac_models.DELETION)
+        for offset, size in self.batches(total):
+            logs = []
+            for action in self.random.choices(actions, (3, 6, 1), k=size):
+                asset = self.random.choice(self.assets)
+                logs.append(ac_models.UserLogs(
+                    user_id=self.random.choice(self.users),
+                    content_type=content_type,
+                    object_id=None if action == ac_models.DELETION else asset,
+                    action=action,
+                    message=f"[title, price] on Asset {asset}"
+                    if action == ac_models.CHANGE else f"Asset {asset}",
+                    action_time=self.past(365),
+                ))
+            ac_models.UserLogs.objects.bulk_create(logs)
+            self.log(f"user logs: {offset + size}/{total}")
+
+
+def percentile(values, percent):
+    """ Nearest-rank ``percent`` percentile of ``values``. """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def get_url_patterns(modules=URL_MODULES):
+    """ ``(name, pattern)`` of every named URL of ``modules``. """
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                yield pattern.name, pattern
+    for module in modules:
+        yield from walk(import_module(module).urlpatterns)
+
+
+def get_view_class(pattern):
+    return getattr(pattern.callback, "view_class", None)
+
+
+def get_samples():
+    """ URL kwargs of the first object of every model, by the URL name of
+        its ``get_absolute_url``.
+    """
+    samples = {}
+    for model in apps.get_models():
+        if not hasattr(model, "get_absolute_url"):
+            continue
+        obj = model._default_manager.order_by().first()
+        if obj is None:
+            continue
+        try:
+            match = resolve(str(obj.get_absolute_url()))
+        except Resolver404:
+            continue
+        samples[match.url_name] = match.kwargs
+    return samples
+
+
+def get_sample_kwargs(pattern, samples):
+    """ URL kwargs for ``pattern``, from ``samples`` or the first object of
+        its view model for a ``pk``; None when they cannot be guessed.
+    """
+    names = set(pattern.pattern.regex.groupindex)
+    if not names:
+        return {}
+    if pattern.name in samples:
+        return samples[pattern.name]
+    view_class = get_view_class(pattern)
+    model = getattr(view_class, "model", None)
+    queryset = getattr(view_class, "queryset", None)
+    if model is None and queryset is not None:
+        model = queryset.model
+    if names != {"pk"} or model is None:
+        return None
+    pk = model._default_manager.order_by().values_list(
+        "pk", flat=True
+    ).first()
+    return None if pk is None else {"pk": pk}
+
+
+class Benchmark:
+    """ Requests every GET URL of ``URL_MODULES`` ``repeat`` times through
+        the test client as ``user``, after ``warmup`` untimed requests, and
+        reports the latency percentiles and queries of each one.
+    """
+
+    def __init__(self, user, repeat=20, warmup=2, include=None,
+                 exclude=EXCLUDE):
+        self.user = user
+        self.repeat = repeat
+        self.warmup = warmup
+        self.include = re.compile(include) if include else None
+        self.exclude = re.compile(exclude) if exclude else None
+
+    def get_targets(self):
+        samples = get_samples()
+        for name, pattern in get_url_patterns():
+            if self.include and not self.include.search(name):
+                continue
+            if self.exclude and self.exclude.search(name):
+                continue
+            view_class = get_view_class(pattern)
+            if view_class is not None and not hasattr(view_class, "get"):
+                continue
+            kwargs = get_sample_kwargs(pattern, samples)
+            if kwargs is None:
+                yield name, None, view_class
+                continue
+            yield name, reverse(name, kwargs=kwargs), view_class
+
+    def run(self):
+        client = Client(raise_request_exception=False)
+        client.force_login(self.user)
+        results = []
+        with override_settings(
+            ALLOWED_HOSTS=["testserver"], QUERY_BUDGET_STRICT=False
+        ):
+            for name, path, view_class in self.get_targets():
+                if path is None:
+                    results.append({"name": name, "skipped": "no sample"})
+                    continue
+                results.append(self.measure(client, name, path, view_class))
+        return {
+            "database": connection.vendor,
+            "repeat": self.repeat,
+            "rows": self.get_row_counts(),
+            "created": timezone.now().isoformat(),
+            "results": results,
+        }
+
+    def measure(self, client, name, path, view_class):
+        for _ in range(self.warmup):
+            self.get(client, path)
+        timings = []
+        queries = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            with count_queries() as counter:
+                status = self.get(client, path)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+        return {
+            "name": name,
+            "path": path,
+            "status": status,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "mean_ms": round(statistics.fmean(timings), 2),
+            "queries": max(queries),
+            "query_budget": getattr(view_class, "query_budget", None),
+        }
+
+    @staticmethod
+    def get(client, path):
+        response = client.get(path)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    @staticmethod
+    def get_row_counts():
+        return {
+            "assets": models.AssetModel.objects.count(),
+            "asset_requests": models.AssetRequest.objects.count(),
+            "user_logs": ac_models.UserLogs.objects.count(),
+            "users": get_user_model().objects.count(),
+        }
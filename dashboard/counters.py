@@ -0,0 +1,55 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from accounts import models as ac_models
+from core.utils.queries import count_tables
+from dashboard import models
+
+
+CACHE_KEY = "dashboard:counters"
+
+
+def get_counted_models():
+    return {
+        "user_count": ac_models.get_user_model(),
+        "designation_count": ac_models.DesignationModel,
+        "group_count": ac_models.Group,
+        "asset_count": models.AssetModel,
+        "asset_status_count": models.AssetStatusModel,
+        "category_count": models.CategoryModel,
+        "supplier_count": models.SupplierModel,
+        "department_count": models.DepartmentModel,
+    }
+
+
+def get_counts():
+    """ Dashboard counters, counted in one query and cached for
+        ``DASHBOARD_COUNTERS_TTL`` seconds or until one of the counted
+        models gains or loses a row.
+    """
+    try:
+        counts = cache.get(CACHE_KEY)
+    except Exception as e:
+        logging.error(e)
+        counts = None
+    if counts is None:
+        counted = get_counted_models()
+        counts = dict(zip(counted, count_tables(
+            counted.values(),
+            getattr(settings, "DASHBOARD_APPROXIMATE_COUNT_THRESHOLD", None)
+        )))
+        try:
+            cache.set(
+                CACHE_KEY, counts,
+                getattr(settings, "DASHBOARD_COUNTERS_TTL", 60)
+            )
+        except Exception as e:
+            logging.error(e)
+    return counts
+
+
+def invalidate():
+    try:
+        cache.delete(CACHE_KEY)
+    except Exception as e:
+        logging.error(e)
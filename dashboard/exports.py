@@ -0,0 +1,171 @@
+import logging
+import os
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.urls import resolve, reverse
+from django.utils import timezone
+from core.utils.decorator import get_required_perms
+from core.utils.permissions import has_perms
+from dashboard.models import ExportJob
+
+JobStatus = ExportJob.JobStatus
+
+
+class Cancelled(Exception):
+    pass
+
+
+def get_root():
+    root = getattr(
+        settings, "EXPORT_ROOT", os.path.join(settings.BASE_DIR, "exports")
+    )
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def get_path(job):
+    """ Local file of ``job``, outside of the public media. """
+    return os.path.join(get_root(), f"{job.pk}.{job.format}")
+
+
+def get_view(job):
+    """ Export view instance of ``job``, giving its queryset and columns.
+    """
+    return resolve(reverse(job.export)).func.view_class()
+
+
+def is_allowed(job):
+    """ Whether the user of ``job`` still holds the permissions of its
+        export view.
+    """
+    return has_perms(job.user, get_required_perms(
+        resolve(reverse(job.export)).func
+    ))
+
+
+def claim():
+    """ Mark the oldest pending job as running and return it, ``None`` when
+        the queue is empty. A job is only claimed by the worker whose
+        conditional UPDATE changed it, so several workers can share the
+        queue.
+    """
+    pending = ExportJob.objects.filter(status=JobStatus.PENDING)
+    for pk in pending.order_by("created_at").values_list("pk", flat=True)[
+        :10
+    ]:
+        if pending.filter(pk=pk).update(
+            status=JobStatus.RUNNING, updated_at=timezone.now()
+        ):
+            return ExportJob.objects.get(pk=pk)
+    return None
+
+
+def cancel(job):
+    """ Cancel ``job`` if it did not finish, the worker building it stops
+        at its next progress report.
+    """
+    return bool(ExportJob.objects.filter(
+        pk=job.pk, status__in=[JobStatus.PENDING, JobStatus.RUNNING]
+    ).update(
+        status=JobStatus.CANCELLED, finished_at=timezone.now(),
+        updated_at=timezone.now()
+    ))
+
+
+def _report(job, rows, size):
+    # The status condition doubles as the cancellation check, a cancelled
+    # job is not updated anymore.
+    if not ExportJob.objects.filter(
+        pk=job.pk, status=JobStatus.RUNNING
+    ).update(rows=rows, size=size, updated_at=timezone.now()):
+        raise Cancelled
+
+
+def run(job, progress_every=None):
+    """ Build the file of the claimed ``job`` in chunks, reporting the
+        number of rows written every ``progress_every`` rows.
+    """
+    if progress_every is None:
+        progress_every = getattr(settings, "EXPORT_JOB_PROGRESS_ROWS", 5000)
+    path = get_path(job)
+    part = f"{path}.part"
+    try:
+        view = get_view(job)
+        if not is_allowed(job):
+            raise PermissionDenied("Permission denied.")
+        tz = view.get_time_zone()
+        queryset = view.get_export_queryset(job.search)
+        job.total = queryset.count()
+        ExportJob.objects.filter(pk=job.pk).update(total=job.total)
+        state = {"rows": 0, "reported": 0}
+
+        def count(rows):
+            for row in rows:
+                state["rows"] += 1
+                yield row
+
+        size = 0
+        with open(part, "wb") as file, timezone.override(tz):
+            for chunk in view.write(job.format, count(
+                view.get_export_rows(queryset, tz)
+            ), tz):
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                file.write(chunk)
+                size += len(chunk)
+                if state["rows"] - state["reported"] >= progress_every:
+                    state["reported"] = state["rows"]
+                    _report(job, state["rows"], size)
+        os.replace(part, path)
+        if not ExportJob.objects.filter(
+            pk=job.pk, status=JobStatus.RUNNING
+        ).update(
+            status=JobStatus.DONE, rows=state["rows"], size=size,
+            finished_at=timezone.now(), updated_at=timezone.now()
+        ):
+            raise Cancelled
+    except Cancelled:
+        _remove(part, path)
+    except Exception as e:
+        logging.error(e)
+        _remove(part, path)
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=JobStatus.FAILED, error=str(e),
+            finished_at=timezone.now(), updated_at=timezone.now()
+        )
+    job.refresh_from_db()
+    return job
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def fail_stale(seconds):
+    """ Fail the running jobs without progress for ``seconds``, left by a
+        worker that stopped.
+    """
+    return ExportJob.objects.filter(
+        status=JobStatus.RUNNING,
+        updated_at__lt=timezone.now() - timezone.timedelta(seconds=seconds)
+    ).update(
+        status=JobStatus.FAILED, error="The export worker stopped.",
+        finished_at=timezone.now(), updated_at=timezone.now()
+    )
+
+
+def purge(days):
+    """ Delete the jobs finished more than ``days`` ago and their files. """
+    jobs = ExportJob.objects.filter(
+        finished_at__lt=timezone.now() - timezone.timedelta(days=days)
+    )
+    removed = 0
+    for job in jobs.iterator():
+        _remove(get_path(job))
+        removed += 1
+    jobs.delete()
+    return removed
@@ -199,11 +199,12 @@ class AssetRequestModelForm(forms.ModelForm):
         model = models.AssetRequest
         fields = (
             "asset", "requested", "details", "status",
-            "request_date", "receive_date", "comment"
+            "request_date", "receive_date", "due_date", "comment"
         )
         widgets = {
             'request_date': forms.DateInput(attrs={'type': "date"}),
             'receive_date': forms.DateInput(attrs={'type': "date"}),
+            'due_date': forms.DateInput(attrs={'type': "date"}),
             "details": forms.Textarea(attrs={'rows': 2}),
             "comment": forms.Textarea(attrs={'rows': 2}),
         }
@@ -214,6 +215,11 @@ class AssetRequestModelForm(forms.ModelForm):
         self.fields['requested'].disabled = True
         self.fields['request_date'].disabled = True
         self.fields['details'].disabled = True
+        allowed = self.instance.get_allowed_statuses()
+        self.fields['status'].choices = [
+            choice for choice in self.fields['status'].choices
+            if choice[0] in allowed
+        ]
         self.helper = helper.FormHelper()
         button_title = "Save"
         delete = ""
@@ -231,6 +237,11 @@ class AssetRequestModelForm(forms.ModelForm):
                 layout.Column('request_date', css_class='form-group col-md-6 mb-0'),  # noqa
                 css_class='form-row'
             ),
+            layout.Row(
+                layout.Column('receive_date', css_class='form-group col-md-6 mb-0'),  # noqa
+                layout.Column('due_date', css_class='form-group col-md-6 mb-0'),  # noqa
+                css_class='form-row'
+            ),
             'details',
             "comment",
             get_form_button(
@@ -241,8 +252,8 @@ class AssetRequestModelForm(forms.ModelForm):
 
     def clean(self):
         approved = models.AssetRequest.RequestStatus.APPROVED
-        if (self.cleaned_data['status'] == approved):
-            if self.cleaned_data['asset'] is None:
+        if (self.cleaned_data.get('status') == approved):
+            if self.cleaned_data.get('asset') is None:
                 self.add_error('asset', "Asset is required")
         return super().clean()
 
@@ -293,3 +304,27 @@ class AssetIssueModeForm(forms.ModelForm):
                 app='dashboard'
             )
         )
+
+
+class AssetImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV file with the columns of the asset export, "
+                  "categories and departments separated by commas.",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv'})
+    )
+    dry_run = forms.BooleanField(
+        required=False, initial=True,
+        help_text="Only check the rows, nothing is saved."
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = helper.FormHelper()
+        self.helper.layout = layout.Layout(
+            'file',
+            'dry_run',
+            layout.Column(
+                layout.Submit('submit', "Import", css_class="px-4"),
+                css_class='text-end'
+            ),
+        )
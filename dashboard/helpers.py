@@ -1,3 +1,9 @@
+import datetime
+from django.db.models import Count, DateField, DateTimeField
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+
 def zero_fill(
     data, attribute, target_range, fill_value=None,
     fill_attributes=()
@@ -14,3 +20,64 @@ def zero_fill(
             fill_record.update(fill_dict)
             new_data.append(fill_record)
     return new_data
+
+
+TRUNC = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+
+def bucket_range(start, end, interval):
+    """ Start date of every ``interval`` bucket between the dates ``start``
+        and ``end``, weeks starting on monday like ``TruncWeek``.
+    """
+    if interval == "week":
+        start -= datetime.timedelta(days=start.weekday())
+    elif interval == "month":
+        start = start.replace(day=1)
+    while start <= end:
+        yield start
+        if interval == "month":
+            start = (start + datetime.timedelta(days=32)).replace(day=1)
+        else:
+            start += datetime.timedelta(days=7 if interval == "week" else 1)
+
+
+def time_series(queryset, field, start, end, interval="day",
+                value=None, tz=None):
+    """ Aggregate ``queryset`` per ``interval`` bucket of ``field`` between
+        the dates ``start`` and ``end`` (both included).
+
+        Buckets are truncated by the database in ``tz``, the active (site)
+        time zone by default, missing buckets are filled with 0 and the
+        result is returned as parallel arrays:
+        ``{"interval": "day", "buckets": [...], "values": [...]}``.
+    """
+    if interval not in TRUNC:
+        raise ValueError(f"Unknown interval {interval!r}.")
+    value = value if value is not None else Count("pk")
+    model_field = queryset.model._meta.get_field(field)
+    if isinstance(model_field, DateTimeField):
+        tz = tz or timezone.get_current_timezone()
+        queryset = queryset.filter(**{
+            f"{field}__gte": timezone.make_aware(
+                datetime.datetime.combine(start, datetime.time.min), tz
+            ),
+            f"{field}__lt": timezone.make_aware(datetime.datetime.combine(
+                end + datetime.timedelta(days=1), datetime.time.min
+            ), tz),
+        })
+        bucket = TRUNC[interval](field, output_field=DateField(), tzinfo=tz)
+    else:
+        queryset = queryset.filter(**{f"{field}__range": (start, end)})
+        bucket = TRUNC[interval](field, output_field=DateField())
+    rows = list(queryset.annotate(bucket=bucket).values("bucket").annotate(
+        value=value
+    ).order_by("bucket"))
+    rows = zero_fill(
+        rows, "bucket", bucket_range(start, end, interval), fill_value=0,
+        fill_attributes=("value",)
+    )
+    return {
+        "interval": interval,
+        "buckets": [row["bucket"].isoformat() for row in rows],
+        "values": [row["value"] or 0 for row in rows],
+    }
@@ -0,0 +1,230 @@
+import csv
+import io
+import time
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.text import capfirst
+from accounts import models as ac_models
+from dashboard import allocator, counters, models
+
+# Headers accepted for every asset field, the export column names included
+# so an asset export can be imported back.
+HEADERS = {
+    "asset_id": "asset_id", "asset id": "asset_id",
+    "title": "title",
+    "model": "model",
+    "description": "description",
+    "price": "price",
+    "status": "asset_status", "asset_status": "asset_status",
+    "category": "category", "categories": "category",
+    "department": "department", "departments": "department",
+    "supplier": "supplier",
+    "active": "is_active", "is_active": "is_active",
+}
+# Export columns set by the application, ignored on import.
+IGNORED = {"added by", "updated at", "created at"}
+FIELDS = ("asset_id", "title", "model", "description", "price", "is_active")
+
+
+class ImportResult:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+        self.started = time.monotonic()
+        self.elapsed = 0
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0
+
+
+class AssetImporter:
+    """ Creates assets from CSV rows, ``chunk_size`` at a time.
+
+        Statuses, categories, departments and suppliers are matched by title
+        (case insensitive) against maps loaded once; a chunk is validated
+        with a single query for the asset ids it reuses and its valid rows
+        are saved in one transaction, with ``bulk_create`` for the assets,
+        their category and department rows and their user logs. Given
+        ``AST-`` ids move the id sequence past them. Invalid rows are
+        reported by line and skipped, ``dry_run`` only validates.
+    """
+
+    def __init__(self, user, request=None, chunk_size=500, dry_run=False):
+        self.user = user
+        self.request = request
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.fields = {
+            name: models.AssetModel._meta.get_field(name) for name in FIELDS
+        }
+        self.lookups = {
+            "asset_status": self.get_lookup(
+                models.AssetStatusModel.objects.filter(
+                    is_active=True, request=False
+                )
+            ),
+            "category": self.get_lookup(
+                models.CategoryModel.objects.filter(is_active=True)
+            ),
+            "department": self.get_lookup(
+                models.DepartmentModel.objects.filter(is_active=True)
+            ),
+            "supplier": self.get_lookup(models.SupplierModel.objects.all()),
+        }
+        self.asset_ids = set()
+
+    @staticmethod
+    def get_lookup(queryset):
+        return {
+            title.strip().lower(): pk
+            for pk, title in queryset.values_list("pk", "title")
+        }
+
+    def run(self, file):
+        """ Import the CSV text ``file``, returning an ``ImportResult``. """
+        result = ImportResult(self.dry_run)
+        reader = csv.DictReader(file)
+        unknown = [
+            header for header in reader.fieldnames or []
+            if self.get_field(header) is None
+            and header.strip().lower() not in IGNORED
+        ]
+        if not reader.fieldnames or "title" not in map(
+            self.get_field, reader.fieldnames
+        ):
+            result.add_error(1, "The file needs a Title column.")
+        elif unknown:
+            result.add_error(1, f"Unknown columns: {', '.join(unknown)}.")
+        else:
+            rows = enumerate(reader, start=2)
+            while chunk := list(islice(rows, self.chunk_size)):
+                self.import_chunk(chunk, result)
+        result.errors.sort()
+        result.elapsed = time.monotonic() - result.started
+        return result
+
+    @staticmethod
+    def get_field(header):
+        return HEADERS.get((header or "").strip().lower())
+
+    def import_chunk(self, chunk, result):
+        result.rows += len(chunk)
+        cleaned = []
+        for line, row in chunk:
+            try:
+                cleaned.append((line, self.clean_row(row)))
+            except ValidationError as e:
+                result.add_error(line, " ".join(e.messages))
+        taken = set(models.AssetModel.objects.filter(asset_id__in=[
+            values.get("asset_id") for _, values in cleaned
+            if values.get("asset_id")
+        ]).values_list("asset_id", flat=True))
+        valid = []
+        for line, values in cleaned:
+            asset_id = values.get("asset_id")
+            if asset_id and (asset_id in taken or asset_id in self.asset_ids):
+                result.add_error(line, f"Asset ID {asset_id} already exists.")
+                continue
+            if asset_id:
+                self.asset_ids.add(asset_id)
+            valid.append(values)
+        if self.dry_run or not valid:
+            return
+        with transaction.atomic():
+            self.save(valid)
+        result.created += len(valid)
+
+    def clean_row(self, row):
+        values = {}
+        errors = []
+        for header, raw in row.items():
+            name = self.get_field(header)
+            raw = (raw or "").strip()
+            if name is None:
+                continue
+            try:
+                if name in self.fields:
+                    values[name] = self.clean_field(name, raw)
+                elif name in ("category", "department"):
+                    values[name] = [
+                        self.get_related(name, title)
+                        for title in raw.split(",") if title.strip()
+                    ]
+                else:
+                    values[name] = raw and self.get_related(name, raw)
+            except ValidationError as e:
+                label = self.get_label(name)
+                errors.extend(f"{label}: {message}" for message in e.messages)
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def get_label(self, name):
+        return capfirst(models.AssetModel._meta.get_field(name).verbose_name)
+
+    def clean_field(self, name, raw):
+        field = self.fields[name]
+        if name == "is_active" and not raw:
+            return True
+        if not raw:
+            if name == "asset_id" or field.blank:
+                return None if field.null else ""
+        return field.clean(raw, None)
+
+    def get_related(self, name, title):
+        pk = self.lookups[name].get(title.strip().lower())
+        if pk is None:
+            raise ValidationError(f"{title.strip()} does not exist.")
+        return pk
+
+    def save(self, rows):
+        allocator.asset_ids.advance(
+            [values["asset_id"] for values in rows if values.get("asset_id")]
+        )
+        missing = [values for values in rows if not values.get("asset_id")]
+        for values, asset_id in zip(
+            missing, models.AssetModel.get_asset_ids(len(missing))
+        ):
+            values["asset_id"] = asset_id
+        assets = []
+        categories = []
+        departments = []
+        Category = models.AssetModel.category.through
+        Department = models.AssetModel.department.through
+        for values in rows:
+            asset = models.AssetModel(
+                added_by=self.user,
+                asset_status_id=values.get("asset_status") or None,
+                supplier_id=values.get("supplier") or None,
+                **{name: values[name] for name in FIELDS if name in values}
+            )
+            assets.append(asset)
+            categories.extend(
+                Category(assetmodel_id=asset.pk, categorymodel_id=pk)
+                for pk in set(values.get("category", []))
+            )
+            departments.extend(
+                Department(assetmodel_id=asset.pk, departmentmodel_id=pk)
+                for pk in set(values.get("department", []))
+            )
+        models.AssetModel.objects.bulk_create(assets)
+        Category.objects.bulk_create(categories)
+        Department.objects.bulk_create(departments)
+        ac_models.UserLogs.create_logs(
+            self.request, assets, ac_models.ADDITION, user=self.user
+        )
+        # bulk_create does not send the post_save signal.
+        transaction.on_commit(counters.invalidate)
+        return assets
+
+
+def open_upload(upload):
+    """ Text file of an uploaded CSV, ignoring a UTF-8 BOM. """
+    return io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
@@ -0,0 +1,39 @@
+import logging
+from django.core.management.base import BaseCommand
+from core.utils import renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the missing thumbnails of the avatars and asset images, "
+        "needed once for the files uploaded before renditions existed or "
+        "after changing their sizes or format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Regenerate the renditions that already exist."
+        )
+
+    def handle(self, *args, **options):
+        written = failed = 0
+        for model, specs in renditions.fields.items():
+            for field_name, spec in specs.items():
+                storage = model._meta.get_field(field_name).storage
+                names = model.objects.exclude(**{
+                    f"{field_name}__isnull": True
+                }).exclude(**{field_name: ""}).values_list(
+                    field_name, flat=True
+                )
+                for name in names.iterator():
+                    try:
+                        written += renditions.generate(
+                            storage, name, spec, force=options["force"]
+                        )
+                    except Exception as e:
+                        logging.error(e)
+                        failed += 1
+        self.stdout.write(
+            f"Wrote {written} renditions, {failed} images failed."
+        )
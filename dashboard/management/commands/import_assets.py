@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.imports import AssetImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Create assets from a CSV file (the columns of the asset export). "
+        "Statuses, categories, departments and suppliers are given by title, "
+        "empty asset ids are allocated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file, UTF-8 encoded.")
+        parser.add_argument(
+            "--user", required=True,
+            help="Email of the user the assets are added by."
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only validate the rows and report the errors."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}.")
+        importer = AssetImporter(
+            user, chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"]
+        )
+        try:
+            with open(
+                options["path"], encoding="utf-8-sig", newline=""
+            ) as file:
+                result = importer.run(file)
+        except OSError as e:
+            raise CommandError(e)
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(
+            f"{result.rows} rows, {len(result.errors)} errors, "
+            f"{result.created} assets created in {result.elapsed:.2f}s "
+            f"({result.rate:.0f} rows/s)."
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from dashboard import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the daily asset request rollup from the asset requests, "
+        "needed once after installing it or changing the site time zone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only recount the days from this date (YYYY-MM-DD)."
+        )
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        if since is not None:
+            since = parse_date(since)
+            if since is None:
+                raise CommandError("--since expects a YYYY-MM-DD date.")
+        rows = rollups.rebuild(since)
+        self.stdout.write(f"Wrote {rows} rollup rows.")
@@ -0,0 +1,51 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.bench import EXCLUDE, Benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every page of the dashboard, accounts and assetdash URLs "
+        "through the test client and report their p50/p95 latency and "
+        "queries as JSON, to diff between commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Email of the user making the requests, the first "
+                 "superuser by default."
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--include", help="Only URL names matching this pattern."
+        )
+        parser.add_argument(
+            "--exclude", default=EXCLUDE,
+            help="Skip URL names matching this pattern (destructive URLs "
+                 "and exports by default)."
+        )
+        parser.add_argument(
+            "--output", help="File to write the JSON to, stdout by default."
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        if options["user"]:
+            user = users.filter(email=options["user"]).first()
+        else:
+            user = users.filter(is_superuser=True).order_by("pk").first()
+        if user is None:
+            raise CommandError("No active user to run the benchmark as.")
+        report = Benchmark(
+            user, repeat=options["repeat"], warmup=options["warmup"],
+            include=options["include"], exclude=options["exclude"]
+        ).run()
+        data = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(data + "\n")
+        else:
+            self.stdout.write(data)
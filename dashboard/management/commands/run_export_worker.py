@@ -0,0 +1,43 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from dashboard import exports
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the queued list exports to local storage, one job at a time. "
+        "Several workers can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once the queue is empty instead of waiting for jobs."
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=2,
+            help="Seconds to wait between checks of an empty queue."
+        )
+        parser.add_argument(
+            "--stale-after", type=int, default=15 * 60,
+            help="Fail running jobs without progress for this many seconds."
+        )
+
+    def handle(self, *args, **options):
+        retention = getattr(settings, "EXPORT_JOB_RETENTION_DAYS", 7)
+        try:
+            while True:
+                exports.fail_stale(options["stale_after"])
+                exports.purge(retention)
+                while job := exports.claim():
+                    job = exports.run(job)
+                    self.stdout.write(
+                        f"{job.filename}: {job.get_status_display()}, "
+                        f"{job.rows} rows."
+                    )
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
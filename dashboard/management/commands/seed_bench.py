@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from dashboard.bench import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Add a synthetic workload for benchmarks: users and groups, assets "
+        "with their categories and departments, asset requests and user "
+        "logs. Never run it against a production database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--groups", type=int, default=50)
+        parser.add_argument("--assets", type=int, default=100000)
+        parser.add_argument("--requests", type=int, default=1000000)
+        parser.add_argument("--logs", type=int, default=5000000)
+        parser.add_argument(
+            "--scale", type=float, default=1,
+            help="Multiply every volume, 0.01 for a quick local run."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Random seed, the same one generates the same data."
+        )
+
+    def handle(self, *args, **options):
+        def scaled(name):
+            return int(options[name] * options["scale"])
+
+        seeder = Seeder(
+            batch_size=options["batch_size"], seed=options["seed"],
+            log=self.stdout.write
+        )
+        seeder.run(
+            users=scaled("users"), groups=max(scaled("groups"), 1),
+            assets=scaled("assets"), requests=scaled("requests"),
+            logs=scaled("logs")
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark data added."))
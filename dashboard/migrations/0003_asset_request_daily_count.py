@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_asset_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetRequestDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'In Progress'), (3, 'Rejected'), (4, 'Approved'), (5, 'In Use'), (6, 'Available'), (7, 'Damage'), (8, 'Return'), (9, 'Expired'), (10, 'Required License Update')])),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='dashboard.departmentmodel')),
+            ],
+            options={
+                'db_table': 'asset_request_daily_count',
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'department'), name='asset_request_daily_count_unique'), models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('day', 'status'), name='asset_request_daily_total_unique')],
+            },
+        ),
+    ]
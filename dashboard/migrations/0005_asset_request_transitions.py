@@ -0,0 +1,58 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_export_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetRequestTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Pending'), (2, 'In Progress'), (3, 'Rejected'), (4, 'Approved'), (5, 'In Use'), (6, 'Available'), (7, 'Damage'), (8, 'Return'), (9, 'Expired'), (10, 'Required License Update')], null=True)),
+                ('target', models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'In Progress'), (3, 'Rejected'), (4, 'Approved'), (5, 'In Use'), (6, 'Available'), (7, 'Damage'), (8, 'Return'), (9, 'Expired'), (10, 'Required License Update')])),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'asset_request_transition',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='assetrequest',
+            name='due_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Return by'),
+        ),
+        migrations.AddField(
+            model_name='assetrequest',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='assetrequest',
+            index=models.Index(condition=models.Q(('status__in', [1, 2])), fields=['created_at'], name='asset_request_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetrequest',
+            index=models.Index(condition=models.Q(('status', 5)), fields=['due_date'], name='asset_request_in_use_idx'),
+        ),
+        migrations.AddField(
+            model_name='assetrequesttransition',
+            name='changed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asset_request_transitions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='assetrequesttransition',
+            name='request',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='dashboard.assetrequest'),
+        ),
+    ]
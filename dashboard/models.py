@@ -1,8 +1,12 @@
-import random
+from collections import defaultdict
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.urls import reverse_lazy
 from core.base.model import BaseModel
+from dashboard.allocator import asset_ids
 from django.utils.translation import gettext as _
 
 
@@ -145,6 +149,17 @@ class AssetStatusModel(BaseModel):
         return "Unknown"
 
 
+class AssetSequence(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.PositiveBigIntegerField()
+
+    class Meta:
+        db_table = "asset_sequence"
+
+    def __str__(self):
+        return self.name
+
+
 class AssetModel(BaseModel):
     asset_id = models.CharField(
         max_length=16, verbose_name=_("Asset ID"), unique=True
@@ -202,10 +217,37 @@ class AssetModel(BaseModel):
 
     @classmethod
     def get_asset_id(cls):
-        number = random.randint(1000000, 9999999)
-        if cls._meta.model.objects.filter(asset_id=f"AST-{number}").exists():
-            return cls.get_asset_id()
-        return f"AST-{number}"
+        return asset_ids.allocate()[0]
+
+    @classmethod
+    def get_asset_ids(cls, count):
+        return asset_ids.allocate(count)
+
+    @classmethod
+    def get_related_titles(cls, ids):
+        """ Category and department titles of the assets ``ids`` fetched
+            with a single UNION query over both through tables.
+        """
+        titles = defaultdict(lambda: {"category": [], "department": []})
+        if not ids:
+            return titles
+        kind = models.CharField()
+        category = cls.category.through.objects.filter(
+            assetmodel_id__in=ids
+        ).annotate(
+            kind=models.Value("category", output_field=kind)
+        ).values_list("assetmodel_id", "categorymodel__title", "kind")
+        department = cls.department.through.objects.filter(
+            assetmodel_id__in=ids
+        ).annotate(
+            kind=models.Value("department", output_field=kind)
+        ).values_list("assetmodel_id", "departmentmodel__title", "kind")
+        for pk, title, _kind in category.union(department, all=True):
+            titles[pk][_kind].append(title)
+        for related in titles.values():
+            related["category"].sort()
+            related["department"].sort()
+        return titles
 
     def get_employees(self):
         employees = "None"
@@ -237,6 +279,33 @@ class AssetModel(BaseModel):
         permissions = [("export_asset", "Can Export Asset")]
 
 
+class AssetRequestQuerySet(models.QuerySet):
+    """ Work queues of the asset requests, each one served by a partial
+        index of ``AssetRequest``.
+    """
+
+    def pending(self):
+        return self.filter(status__in=AssetRequest.PENDING_STATUSES)
+
+    def expiring(self, days=None):
+        """ Requests in use due back within ``days``
+            (``ASSET_REQUEST_EXPIRING_DAYS`` by default).
+        """
+        if days is None:
+            days = getattr(settings, "ASSET_REQUEST_EXPIRING_DAYS", 7)
+        now = timezone.now()
+        return self.filter(
+            status=AssetRequest.RequestStatus.IN_USE, due_date__gte=now,
+            due_date__lt=now + timezone.timedelta(days=days)
+        )
+
+    def overdue(self):
+        return self.filter(
+            status=AssetRequest.RequestStatus.IN_USE,
+            due_date__lt=timezone.now()
+        )
+
+
 class AssetRequest(BaseModel):
     class RequestStatus(models.IntegerChoices):
         PENDING = 1, "Pending"
@@ -250,6 +319,41 @@ class AssetRequest(BaseModel):
         EXPIRED = 9, "Expired"
         Required_License_Update = 10, "Required License Update"
 
+    # Statuses a request can move to from each status.
+    TRANSITIONS = {
+        RequestStatus.PENDING: (
+            RequestStatus.PROGRESS, RequestStatus.APPROVED,
+            RequestStatus.REJECTED
+        ),
+        RequestStatus.PROGRESS: (
+            RequestStatus.PENDING, RequestStatus.APPROVED,
+            RequestStatus.REJECTED
+        ),
+        RequestStatus.REJECTED: (RequestStatus.PENDING,),
+        RequestStatus.APPROVED: (
+            RequestStatus.IN_USE, RequestStatus.RETURN, RequestStatus.REJECTED
+        ),
+        RequestStatus.IN_USE: (
+            RequestStatus.RETURN, RequestStatus.DAMAGE, RequestStatus.EXPIRED,
+            RequestStatus.Required_License_Update
+        ),
+        RequestStatus.DAMAGE: (RequestStatus.IN_USE, RequestStatus.RETURN),
+        RequestStatus.EXPIRED: (RequestStatus.IN_USE, RequestStatus.RETURN),
+        RequestStatus.Required_License_Update: (
+            RequestStatus.IN_USE, RequestStatus.EXPIRED, RequestStatus.RETURN
+        ),
+        RequestStatus.RETURN: (RequestStatus.AVAILABLE,),
+        RequestStatus.AVAILABLE: (),
+    }
+    # Bulk actions of the request list and the status they set, applied to
+    # the requests allowed to move to it.
+    BULK_ACTIONS = {
+        "approve": RequestStatus.APPROVED,
+        "reject": RequestStatus.REJECTED,
+        "return": RequestStatus.RETURN,
+    }
+    PENDING_STATUSES = (RequestStatus.PENDING, RequestStatus.PROGRESS)
+
     asset = models.ForeignKey(
         to=AssetModel, on_delete=models.CASCADE,
         null=True, blank=True
@@ -272,8 +376,80 @@ class AssetRequest(BaseModel):
     receive_date = models.DateTimeField(
         auto_now_add=False, null=True, blank=True
     )
+    due_date = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Return by")
+    )
+    status_changed_at = models.DateTimeField(null=True, blank=True)
     comment = models.TextField(null=True, blank=True)
 
+    objects = AssetRequestQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    @classmethod
+    def get_sources(cls, status):
+        """ Statuses a request can move to ``status`` from. """
+        return [
+            source for source, targets in cls.TRANSITIONS.items()
+            if status in targets
+        ]
+
+    def get_stored_status(self):
+        if self._state.adding:
+            return None
+        status = getattr(self, "_loaded_status", None)
+        if status is None:
+            status = type(self).objects.filter(pk=self.pk).values_list(
+                "status", flat=True
+            ).first()
+        return status
+
+    def get_allowed_statuses(self):
+        """ Statuses the request can be saved with, its own included. """
+        status = self.get_stored_status()
+        if status is None:
+            return list(self.RequestStatus)
+        return [status, *self.TRANSITIONS[status]]
+
+    def clean(self):
+        super().clean()
+        if self.status not in self.get_allowed_statuses():
+            raise ValidationError({"status": _(
+                "A request cannot move from %(source)s to %(target)s."
+            ) % {
+                "source": self.RequestStatus(
+                    self.get_stored_status()
+                ).label,
+                "target": self.get_status_display(),
+            }})
+
+    def save(self, *args, changed_by=None, **kwargs):
+        """ Save the request, recording an ``AssetRequestTransition`` when
+            its status changed. ``changed_by`` is the user moving it.
+        """
+        source = self.get_stored_status()
+        update_fields = kwargs.get("update_fields")
+        moved = source != self.status and (
+            update_fields is None or "status" in update_fields
+        )
+        if moved:
+            self.status_changed_at = timezone.now()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "status_changed_at"
+                }
+        super().save(*args, **kwargs)
+        if moved:
+            AssetRequestTransition.objects.create(
+                request=self, source=source, target=self.status,
+                changed_by=changed_by, created_at=self.status_changed_at
+            )
+        self._loaded_status = self.status
+
     def __str__(self):
         if self.asset:
             return f"{self.asset.title} Requested by {self.requested}"
@@ -298,6 +474,19 @@ class AssetRequest(BaseModel):
         verbose_name = _("Asset Request")
         verbose_name_plural = _("Asset Request")
         permissions = [("export_assetrequest", "Can Export Asset Request")]
+        indexes = [
+            # Partial indexes of the work queues (pending and in progress,
+            # in use), they stay small whatever the number of closed
+            # requests.
+            models.Index(
+                fields=["created_at"], name="asset_request_pending_idx",
+                condition=models.Q(status__in=[1, 2])
+            ),
+            models.Index(
+                fields=["due_date"], name="asset_request_in_use_idx",
+                condition=models.Q(status=5)
+            ),
+        ]
 
     def get_absolute_url(self):
         return reverse_lazy("asset_request_update", kwargs={"pk": self.pk})
@@ -314,6 +503,33 @@ class AssetRequest(BaseModel):
         return reverse_lazy("asset_request_list")
 
 
+class AssetRequestTransition(models.Model):
+    """ Status change of an asset request, ``source`` is empty for the
+        status it was created with.
+    """
+    request = models.ForeignKey(
+        to=AssetRequest, on_delete=models.CASCADE, related_name="transitions"
+    )
+    source = models.PositiveSmallIntegerField(
+        choices=AssetRequest.RequestStatus.choices, null=True, blank=True
+    )
+    target = models.PositiveSmallIntegerField(
+        choices=AssetRequest.RequestStatus.choices
+    )
+    changed_by = models.ForeignKey(
+        to=get_user_model(), on_delete=models.SET_NULL, null=True,
+        blank=True, related_name="asset_request_transitions"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "asset_request_transition"
+        ordering = ["created_at", "id"]
+
+    def __str__(self):
+        return f"{self.get_source_display()} -> {self.get_target_display()}"
+
+
 class AssetIssue(BaseModel):
     asset = models.ForeignKey(to=AssetModel, on_delete=models.CASCADE)
     status = models.ForeignKey(AssetStatusModel, on_delete=models.CASCADE)
@@ -350,3 +566,104 @@ class AssetIssue(BaseModel):
     @staticmethod
     def list_url():
         return reverse_lazy("asset_issue_list")
+
+
+class AssetRequestDailyCount(models.Model):
+    """ Number of asset requests created per day (in the site time zone),
+        status and department of the requested asset, kept up to date by
+        ``dashboard.rollups``. Rows without department hold the totals.
+    """
+    day = models.DateField()
+    status = models.PositiveSmallIntegerField(
+        choices=AssetRequest.RequestStatus.choices
+    )
+    department = models.ForeignKey(
+        to=DepartmentModel, on_delete=models.CASCADE, null=True, blank=True
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "asset_request_daily_count"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "department"],
+                name="asset_request_daily_count_unique"
+            ),
+            models.UniqueConstraint(
+                fields=["day", "status"],
+                condition=models.Q(department__isnull=True),
+                name="asset_request_daily_total_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.get_status_display()}: {self.count}"
+
+
+class ExportJob(BaseModel):
+    """ Export of a list built in the background by ``run_export_worker``.
+
+        ``export`` is the url name of the list export view, which gives the
+        queryset, columns and permissions of the job.
+    """
+    class JobStatus(models.IntegerChoices):
+        PENDING = 1, "Pending"
+        RUNNING = 2, "Running"
+        DONE = 3, "Done"
+        FAILED = 4, "Failed"
+        CANCELLED = 5, "Cancelled"
+
+    user = models.ForeignKey(
+        to=get_user_model(), on_delete=models.CASCADE,
+        related_name="export_jobs"
+    )
+    export = models.CharField(max_length=100)
+    format = models.CharField(max_length=10)
+    search = models.CharField(max_length=255, blank=True, default="")
+    filename = models.CharField(max_length=255)
+    status = models.PositiveSmallIntegerField(
+        choices=JobStatus.choices, default=JobStatus.PENDING
+    )
+    rows = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "export_job"
+        verbose_name = _("Export Job")
+        verbose_name_plural = _("Export Jobs")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"],
+                name="export_job_status_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def is_active(self):
+        return self.status in (
+            self.JobStatus.PENDING, self.JobStatus.RUNNING
+        )
+
+    def get_progress(self):
+        if self.status == self.JobStatus.DONE:
+            return 100
+        if not self.total:
+            return 0
+        return min(99, self.rows * 100 // self.total)
+
+    def get_absolute_url(self):
+        return reverse_lazy("export_job_download", kwargs={"pk": self.pk})
+
+    def get_absolute_cancel_url(self):
+        return reverse_lazy("export_job_cancel", kwargs={"pk": self.pk})
+
+    @staticmethod
+    def list_url():
+        return reverse_lazy("export_job_list")
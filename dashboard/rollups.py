@@ -0,0 +1,150 @@
+import logging
+from collections import Counter, defaultdict
+import pytz
+from django.contrib.sites.models import Site
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from configuration import cache
+from dashboard import models
+
+
+def get_time_zone():
+    """ Time zone the request days are counted in, the site's one. """
+    return pytz.timezone(
+        cache.get_runtime_config(Site.objects.get_current()).time_zone
+    )
+
+
+def get_key(asset_request):
+    """ ``(created_at, status, asset_id)`` an asset request is counted
+        under.
+    """
+    return (
+        asset_request.created_at, asset_request.status,
+        asset_request.asset_id
+    )
+
+
+def _get_departments(asset_ids):
+    departments = defaultdict(list)
+    asset_ids = [asset_id for asset_id in asset_ids if asset_id is not None]
+    if not asset_ids:
+        return departments
+    for asset_id, department_id in (
+        models.AssetModel.department.through.objects.filter(
+            assetmodel_id__in=asset_ids
+        ).values_list("assetmodel_id", "departmentmodel_id")
+    ):
+        departments[asset_id].append(department_id)
+    return departments
+
+
+def _add(day, status, department_id, delta):
+    counts = models.AssetRequestDailyCount.objects
+    rows = counts.filter(day=day, status=status, department_id=department_id)
+    if delta < 0:
+        # A drifted counter stops at 0, `rebuild_request_rollups` recounts.
+        if not rows.filter(count__gte=-delta).update(
+            count=F("count") + delta
+        ) and rows.exclude(count=0).update(count=0):
+            logging.warning(
+                f"Asset request rollup {day} {status} {department_id} "
+                f"went below 0."
+            )
+        return
+    if rows.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            counts.create(
+                day=day, status=status, department_id=department_id,
+                count=delta
+            )
+    except IntegrityError:
+        rows.update(count=F("count") + delta)
+
+
+def apply_many(changes):
+    """ Apply ``(key, delta)`` pairs, summed per day, status and department
+        first so a bulk change costs one UPDATE per counter it touches.
+    """
+    changes = list(changes)
+    tz = get_time_zone()
+    departments = _get_departments({key[2] for key, _ in changes})
+    totals = Counter()
+    for (created_at, status, asset_id), delta in changes:
+        day = timezone.localdate(created_at, tz)
+        for department_id in [None] + departments[asset_id]:
+            totals[day, status, department_id] += delta
+    _apply_totals(totals)
+
+
+def _apply_totals(totals):
+    for (day, status, department_id), delta in totals.items():
+        if delta:
+            _add(day, status, department_id, delta)
+
+
+def apply(key, delta):
+    """ Add ``delta`` to the total and department counters of ``key``. """
+    apply_many([(key, delta)])
+
+
+def move_departments(links, sign):
+    """ Add (``sign`` 1) or remove (-1) the requests of assets from the
+        counters of departments, for ``(asset_id, department_id)`` links
+        being created or deleted.
+    """
+    assets = defaultdict(list)
+    for asset_id, department_id in links:
+        assets[asset_id].append(department_id)
+    if not assets:
+        return
+    totals = Counter()
+    for row in models.AssetRequest.objects.filter(
+        asset_id__in=assets
+    ).annotate(
+        day=TruncDate("created_at", tzinfo=get_time_zone())
+    ).values("day", "status", "asset_id").annotate(
+        count=Count("id")
+    ).order_by():
+        for department_id in assets[row["asset_id"]]:
+            totals[row["day"], row["status"], department_id] += (
+                sign * row["count"]
+            )
+    _apply_totals(totals)
+
+
+@transaction.atomic
+def rebuild(since=None):
+    """ Recount every request created on or after the day ``since`` (all
+        of them by default) in a couple of GROUP BY queries.
+    """
+    tz = get_time_zone()
+    requests = models.AssetRequest.objects.annotate(
+        day=TruncDate("created_at", tzinfo=tz)
+    )
+    counts = models.AssetRequestDailyCount.objects.all()
+    if since is not None:
+        requests = requests.filter(day__gte=since)
+        counts = counts.filter(day__gte=since)
+    counts.delete()
+    rows = [
+        models.AssetRequestDailyCount(
+            day=row["day"], status=row["status"], count=row["count"]
+        ) for row in requests.values("day", "status").annotate(
+            count=Count("id")
+        ).order_by()
+    ]
+    rows += [
+        models.AssetRequestDailyCount(
+            day=row["day"], status=row["status"],
+            department_id=row["asset__department"], count=row["count"]
+        ) for row in requests.filter(asset__department__isnull=False).values(
+            "day", "status", "asset__department"
+        ).annotate(count=Count("id")).order_by()
+    ]
+    models.AssetRequestDailyCount.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_init, pre_save, post_save, pre_delete, post_delete
+)
+from django.dispatch import receiver
+from core.utils import renditions
+from . import counters, models, rollups
+
+
+@receiver(post_init, sender=models.AssetRequest)
+def remember_rollup_key(sender, instance, **kwargs):
+    # Deferred fields are left alone, pre_save reads them when needed.
+    values = instance.__dict__
+    if values.get("created_at") is not None and "status" in values and (
+        "asset_id" in values
+    ):
+        instance._rollup_key = rollups.get_key(instance)
+    else:
+        instance._rollup_key = None
+
+
+@receiver(pre_save, sender=models.AssetRequest)
+def load_rollup_key(sender, instance, **kwargs):
+    if instance._rollup_key is None and not instance._state.adding:
+        stored = sender.objects.filter(pk=instance.pk).only(
+            "created_at", "status", "asset_id"
+        ).first()
+        instance._rollup_key = stored and stored._rollup_key
+
+
+@receiver(post_save, sender=models.AssetRequest)
+def update_rollup(sender, instance, **kwargs):
+    key = rollups.get_key(instance)
+    if key != instance._rollup_key:
+        if instance._rollup_key is not None:
+            rollups.apply(instance._rollup_key, -1)
+        rollups.apply(key, 1)
+        instance._rollup_key = key
+
+
+@receiver(pre_delete, sender=models.AssetRequest)
+def remove_from_rollup(sender, instance, **kwargs):
+    # Sent before the cascade removes the asset departments.
+    rollups.apply(instance._rollup_key or rollups.get_key(instance), -1)
+
+
+@receiver(m2m_changed, sender=models.AssetModel.department.through)
+def move_department_rollups(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    # Department counters follow the current departments of the assets.
+    if action == "post_add":
+        rollups.move_departments([
+            (pk, instance.pk) if reverse else (instance.pk, pk)
+            for pk in pk_set
+        ], 1)
+    elif action in ("pre_remove", "pre_clear"):
+        own, other = "assetmodel_id", "departmentmodel_id"
+        if reverse:
+            own, other = other, own
+        links = sender.objects.filter(**{own: instance.pk})
+        if action == "pre_remove":
+            links = links.filter(**{f"{other}__in": pk_set})
+        rollups.move_departments(links.values_list(
+            "assetmodel_id", "departmentmodel_id"
+        ), -1)
+
+
+def invalidate_counters(sender, created=True, **kwargs):
+    if created:
+        transaction.on_commit(counters.invalidate)
+
+
+for counted_model in counters.get_counted_models().values():
+    # Proxies (accounts.Group) send their own signals.
+    for sender in {counted_model, counted_model._meta.concrete_model}:
+        post_save.connect(invalidate_counters, sender=sender)
+        post_delete.connect(invalidate_counters, sender=sender)
+
+
+renditions.register(models.AssetModel, "image", "asset")
+renditions.register(models.AssetModel, "receipt", "asset")
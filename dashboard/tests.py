@@ -0,0 +1,505 @@
+import io
+import os
+import tempfile
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import (
+    RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+from core.base.datatable import Column, DataTableView
+from core.utils.export import file_response
+from core.utils.queries import check_query_budget
+from dashboard import actions, allocator, models, rollups
+from dashboard.imports import AssetImporter
+
+Status = models.AssetRequest.RequestStatus
+
+
+class AssetRequestRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="rollup@example.com", password="x", name="Rollup"
+        )
+        cls.first = models.DepartmentModel.objects.create(title="First")
+        cls.second = models.DepartmentModel.objects.create(title="Second")
+
+    def setUp(self):
+        self.asset = models.AssetModel.objects.create(
+            title="Laptop", added_by=self.user
+        )
+        self.asset.department.set([self.first])
+
+    def create_request(self, **kwargs):
+        return models.AssetRequest.objects.create(
+            asset=self.asset, requested=self.user, **kwargs
+        )
+
+    def get_counts(self):
+        """ ``{(status, department_id): count}`` of the non-zero rows. """
+        return {
+            (row.status, row.department_id): row.count
+            for row in models.AssetRequestDailyCount.objects.exclude(count=0)
+        }
+
+    def assertRebuilt(self):
+        counts = self.get_counts()
+        rollups.rebuild()
+        self.assertEqual(counts, self.get_counts())
+
+    def test_create_and_transition(self):
+        request = self.create_request()
+        self.assertEqual(self.get_counts(), {
+            (Status.PENDING, None): 1, (Status.PENDING, self.first.pk): 1,
+        })
+        request.status = Status.APPROVED
+        request.save()
+        self.assertEqual(self.get_counts(), {
+            (Status.APPROVED, None): 1, (Status.APPROVED, self.first.pk): 1,
+        })
+        self.assertRebuilt()
+
+    def test_department_change_moves_counts(self):
+        request = self.create_request()
+        self.asset.department.set([self.second])
+        self.assertEqual(self.get_counts(), {
+            (Status.PENDING, None): 1, (Status.PENDING, self.second.pk): 1,
+        })
+        request.status = Status.REJECTED
+        request.save()
+        self.assertEqual(self.get_counts(), {
+            (Status.REJECTED, None): 1, (Status.REJECTED, self.second.pk): 1,
+        })
+        self.assertRebuilt()
+
+    def test_reverse_add_remove_and_clear(self):
+        self.create_request()
+        self.second.department_asset.add(self.asset)
+        self.assertEqual(self.get_counts(), {
+            (Status.PENDING, None): 1, (Status.PENDING, self.first.pk): 1,
+            (Status.PENDING, self.second.pk): 1,
+        })
+        self.first.department_asset.remove(self.asset)
+        # Removing a department the asset does not have changes nothing.
+        self.first.department_asset.remove(self.asset)
+        self.assertEqual(self.get_counts(), {
+            (Status.PENDING, None): 1, (Status.PENDING, self.second.pk): 1,
+        })
+        self.asset.department.clear()
+        self.assertEqual(self.get_counts(), {(Status.PENDING, None): 1})
+        self.assertRebuilt()
+
+    def test_delete_after_department_change(self):
+        request = self.create_request()
+        self.asset.department.set([self.second])
+        request.delete()
+        self.assertEqual(self.get_counts(), {})
+
+    def test_delete_of_drifted_counter_stops_at_zero(self):
+        request = self.create_request()
+        models.AssetRequestDailyCount.objects.filter(
+            department=self.first
+        ).update(count=0)
+        request.delete()
+        self.assertFalse(models.AssetRequestDailyCount.objects.filter(
+            count__gt=0
+        ).exists())
+
+    def test_asset_delete(self):
+        self.create_request()
+        self.create_request(status=Status.PROGRESS)
+        self.asset.delete()
+        self.assertEqual(self.get_counts(), {})
+
+
+class BulkActionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            email="bulk@example.com", password="x", name="Bulk"
+        )
+        cls.asset = models.AssetModel.objects.create(
+            title="Laptop", added_by=cls.user
+        )
+
+    def setUp(self):
+        self.request = RequestFactory().post("/")
+        self.request.user = self.user
+
+    def test_approve_skips_requests_without_asset(self):
+        with_asset = models.AssetRequest.objects.create(
+            asset=self.asset, requested=self.user
+        )
+        without_asset = models.AssetRequest.objects.create(
+            requested=self.user
+        )
+        changed = actions.apply_bulk_action(
+            self.request, [with_asset.pk, without_asset.pk], "approve"
+        )
+        self.assertEqual([obj.pk for obj in changed], [with_asset.pk])
+        without_asset.refresh_from_db()
+        self.assertEqual(without_asset.status, Status.PENDING)
+
+    def test_reject_without_asset(self):
+        request = models.AssetRequest.objects.create(requested=self.user)
+        changed = actions.apply_bulk_action(
+            self.request, [request.pk], "reject"
+        )
+        self.assertEqual([obj.pk for obj in changed], [request.pk])
+
+
+class DepartmentTable(DataTableView):
+    queryset = models.DepartmentModel.objects.all()
+    columns = [
+        Column("title", searchable=True),
+        Column("description", searchable=True),
+        Column("is_active"),
+    ]
+    ordering = ("title",)
+    max_length = 5
+
+
+class DataTableViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        models.DepartmentModel.objects.bulk_create([
+            models.DepartmentModel(
+                title=f"Department {index:02}", is_active=index % 2 == 0,
+                description="Finance" if index < 3 else "Support"
+            ) for index in range(12)
+        ])
+
+    def get_data(self, **params):
+        view = DepartmentTable()
+        view.can_delete = False
+        return view.get_data(params)
+
+    def get_titles(self, data):
+        return [row["title"] for row in data["data"]]
+
+    def test_pages(self):
+        data = self.get_data(draw="3", start="4", length="3")
+        self.assertEqual(data["draw"], 3)
+        self.assertEqual(data["recordsTotal"], 12)
+        self.assertEqual(data["recordsFiltered"], 12)
+        self.assertEqual(self.get_titles(data), [
+            "Department 04", "Department 05", "Department 06"
+        ])
+
+    def test_length_is_bounded(self):
+        for length in ("0", "50", "nan"):
+            data = self.get_data(length=length)
+            self.assertEqual(len(data["data"]), DepartmentTable.max_length)
+
+    def test_search(self):
+        data = self.get_data(**{"search[value]": "finance"})
+        self.assertEqual(data["recordsTotal"], 12)
+        self.assertEqual(data["recordsFiltered"], 3)
+        self.assertEqual(self.get_titles(data), [
+            "Department 00", "Department 01", "Department 02"
+        ])
+
+    def test_ordering(self):
+        data = self.get_data(**{
+            "order[0][column]": "0", "order[0][dir]": "desc",
+            "columns[0][data]": "title", "length": "2",
+        })
+        self.assertEqual(self.get_titles(data), [
+            "Department 11", "Department 10"
+        ])
+
+    def test_unknown_column_is_not_ordered(self):
+        data = self.get_data(**{
+            "order[0][column]": "0", "order[0][dir]": "desc",
+            "columns[0][data]": "pk; DROP TABLE", "length": "1",
+        })
+        self.assertEqual(self.get_titles(data), ["Department 00"])
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(2):
+            self.get_data(length="5")
+        with self.assertNumQueries(3):
+            self.get_data(**{"search[value]": "Support", "length": "5"})
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_asset_list_data(self):
+        user = get_user_model().objects.create_superuser(
+            email="table@example.com", password="x", name="Table"
+        )
+        models.AssetModel.objects.create(title="Laptop", added_by=user)
+        self.client.force_login(user)
+        response = self.client.get(reverse("asset_list_data"), {"draw": 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["recordsTotal"], 1)
+        self.assertEqual(data["data"][0]["title"], "Laptop")
+        self.assertIn("update_url", data["data"][0])
+
+
+@override_settings(ASSET_ID_BLOCK_SIZE=5, ASSET_ID_CHECK_DIGIT=False)
+class AssetIdAllocatorTests(TransactionTestCase):
+
+    def get_next_value(self):
+        return models.AssetSequence.objects.get(name="test").next_value
+
+    def test_reserves_blocks_in_autocommit(self):
+        ids = allocator.AssetIdAllocator("test")
+        self.assertEqual(ids.allocate(), ["AST-1000000"])
+        self.assertEqual(self.get_next_value(), 1000005)
+        with self.assertNumQueries(0):
+            self.assertEqual(ids.allocate(3), [
+                "AST-1000001", "AST-1000002", "AST-1000003"
+            ])
+        # The rest of the block, then a block large enough for the request.
+        self.assertEqual(ids.allocate(7), [
+            f"AST-{number}" for number in range(1000004, 1000011)
+        ])
+        self.assertEqual(self.get_next_value(), 1000011)
+
+    def test_processes_get_distinct_blocks(self):
+        first = allocator.AssetIdAllocator("test")
+        second = allocator.AssetIdAllocator("test")
+        self.assertEqual(first.allocate(), ["AST-1000000"])
+        self.assertEqual(second.allocate(), ["AST-1000005"])
+        self.assertEqual(first.allocate(), ["AST-1000001"])
+
+    def test_reserves_exact_count_in_transactions(self):
+        ids = allocator.AssetIdAllocator("test")
+        with transaction.atomic():
+            self.assertEqual(ids.allocate(2), ["AST-1000000", "AST-1000001"])
+        self.assertEqual(self.get_next_value(), 1000002)
+        self.assertEqual(ids.allocate(), ["AST-1000002"])
+
+    def test_seeds_past_existing_ids(self):
+        user = get_user_model().objects.create_user(
+            email="seed@example.com", password="x", name="Seed"
+        )
+        for asset_id in ("AST-1000041", "AST-99", "LEGACY-5000000"):
+            models.AssetModel.objects.create(
+                asset_id=asset_id, title=asset_id, added_by=user
+            )
+        ids = allocator.AssetIdAllocator("test")
+        self.assertEqual(ids.allocate(), ["AST-1000042"])
+
+    def test_advance_past_imported_numbers(self):
+        ids = allocator.AssetIdAllocator("test")
+        self.assertEqual(ids.allocate(), ["AST-1000000"])
+        # The block holding an imported number is given up.
+        ids.advance(["AST-1000002", "LEGACY-1000009", "AST-1000001x"])
+        self.assertEqual(self.get_next_value(), 1000005)
+        self.assertEqual(ids.allocate(), ["AST-1000005"])
+        ids.advance(["AST-1000020"])
+        self.assertEqual(self.get_next_value(), 1000021)
+        self.assertEqual(ids.allocate(4), [
+            "AST-1000006", "AST-1000007", "AST-1000008", "AST-1000009"
+        ])
+        self.assertEqual(ids.allocate(), ["AST-1000021"])
+
+    @override_settings(ASSET_ID_CHECK_DIGIT=True)
+    def test_check_digit(self):
+        self.assertEqual(allocator.check_digit(7992739871), 3)
+        ids = allocator.AssetIdAllocator("test")
+        self.assertEqual(ids.allocate(), ["AST-10000008"])
+        self.assertEqual(ids.parse("AST-10000008"), 1000000)
+        self.assertIsNone(ids.parse("AST-10000007"))
+
+
+class AssetRequestBarChartTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            email="chart@example.com", password="x", name="Chart"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse("asset_request_bar"), params)
+
+    def test_series(self):
+        response = self.get(date="2024-01-01&2024-01-03")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["values"]), 3)
+
+    def test_invalid_dates(self):
+        for params in (
+            {}, {"date": "2024-01-01"}, {"date": "2024-01-01&"},
+            {"date": "&2024-01-01"}, {"date": "2024-13-01&2024-01-01"},
+            {"date": "2024-01-03&2024-01-01"},
+            {"date": "2024-01-01&2024-01-02&2024-01-03"},
+            {"date": "2024-01-01&2024-01-03", "interval": "hour"},
+        ):
+            with self.subTest(params=params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    response.json(), {"buckets": [], "values": []}
+                )
+
+
+class QueryBudgetTests(TestCase):
+
+    def test_over_budget_logs(self):
+        self.assertTrue(check_query_budget("view", 3, 3))
+        self.assertTrue(check_query_budget("view", 30, None))
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertFalse(check_query_budget("view", 4, 3))
+        self.assertIn("view ran 4 queries, budget is 3.", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_over_budget_raises_when_strict(self):
+        with self.assertRaises(AssertionError):
+            check_query_budget("view", 4, 3)
+
+
+class FileResponseTests(TestCase):
+
+    def setUp(self):
+        file = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+        file.write(b"0123456789")
+        file.close()
+        self.path = file.name
+        self.addCleanup(os.remove, self.path)
+
+    def get(self, **headers):
+        request = RequestFactory().get("/", headers=headers)
+        response = file_response(
+            request, self.path, "assets.csv", "text/csv"
+        )
+        self.addCleanup(response.close)
+        return response
+
+    def get_content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_download(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn('filename="assets.csv"', response["Content-Disposition"])
+        self.assertEqual(self.get_content(response), b"0123456789")
+
+    def test_ranges(self):
+        for header, content_range, content in (
+            ("bytes=2-5", "bytes 2-5/10", b"2345"),
+            ("bytes=7-", "bytes 7-9/10", b"789"),
+            ("bytes=-3", "bytes 7-9/10", b"789"),
+            ("bytes=8-20", "bytes 8-9/10", b"89"),
+        ):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], content_range)
+                self.assertEqual(
+                    response["Content-Length"], str(len(content))
+                )
+                self.assertEqual(self.get_content(response), content)
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=10-", "bytes=-0"):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_ignored_ranges(self):
+        for header in ("bytes=5-2", "bytes=0-1,4-5", "items=0-1"):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(Range=header).status_code, 200)
+
+    def test_if_range(self):
+        etag = self.get()["ETag"]
+        last_modified = self.get()["Last-Modified"]
+        for validator in (etag, last_modified):
+            response = self.get(Range="bytes=0-1", If_Range=validator)
+            self.assertEqual(response.status_code, 206)
+        # A changed file is sent whole.
+        response = self.get(Range="bytes=0-1", If_Range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_content(response), b"0123456789")
+
+
+@override_settings(ASSET_ID_CHECK_DIGIT=False)
+class AssetImporterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="import@example.com", password="x", name="Import"
+        )
+        cls.category = models.CategoryModel.objects.create(title="Laptops")
+        cls.department = models.DepartmentModel.objects.create(title="IT")
+
+    def run_import(self, text, **kwargs):
+        return AssetImporter(self.user, **kwargs).run(io.StringIO(text))
+
+    def test_import(self):
+        result = self.run_import(
+            "Title,Asset ID,Category,Department,Price\n"
+            "Laptop,,laptops,IT,100\n"
+            "Phone,AST-42,,,\n"
+        )
+        self.assertEqual(result.errors, [])
+        self.assertEqual((result.rows, result.created), (2, 2))
+        laptop = models.AssetModel.objects.get(title="Laptop")
+        self.assertTrue(laptop.asset_id.startswith("AST-"))
+        self.assertEqual(laptop.price, 100)
+        self.assertEqual(list(laptop.category.all()), [self.category])
+        self.assertEqual(list(laptop.department.all()), [self.department])
+        self.assertTrue(
+            models.AssetModel.objects.filter(asset_id="AST-42").exists()
+        )
+
+    def test_row_errors(self):
+        models.AssetModel.objects.create(
+            asset_id="AST-7", title="Taken", added_by=self.user
+        )
+        result = self.run_import(
+            "Title,Asset ID,Category\n"
+            "One,AST-7,\n"
+            "Two,AST-8,\n"
+            "Three,AST-8,\n"
+            "Four,,Phones\n"
+            ",,\n",
+            chunk_size=2
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 4, 5, 6])
+        self.assertIn("Phones does not exist", result.errors[2][1])
+
+    def test_columns(self):
+        self.assertEqual(
+            self.run_import("Name\nLaptop\n").errors,
+            [(1, "The file needs a Title column.")]
+        )
+        self.assertEqual(
+            self.run_import("Title,Colour\nLaptop,Red\n").errors,
+            [(1, "Unknown columns: Colour.")]
+        )
+
+    def test_dry_run(self):
+        result = self.run_import("Title\nLaptop\n", dry_run=True)
+        self.assertEqual((result.rows, result.created), (1, 0))
+        self.assertFalse(models.AssetModel.objects.exists())
+
+    def test_imported_ids_are_not_allocated(self):
+        number = allocator.asset_ids.parse(
+            models.AssetModel.get_asset_id()
+        )
+        ahead = [f"AST-{number + 1}", f"AST-{number + 3}"]
+        result = self.run_import(
+            "Title,Asset ID\n"
+            f"Imported,{ahead[0]}\nImported,{ahead[1]}\nAllocated,\n"
+        )
+        self.assertEqual(result.errors, [])
+        allocated = models.AssetModel.objects.get(title="Allocated")
+        self.assertEqual(allocated.asset_id, f"AST-{number + 4}")
+        self.assertEqual(
+            models.AssetModel.get_asset_id(), f"AST-{number + 5}"
+        )
@@ -6,13 +6,21 @@ urlpatterns = [
     path('asset/request/',
          views.AssetRequestBarChartView.as_view(), name='asset_request_bar'),
     path('asset-list/', views.AssetListView.as_view(), name="asset_list"),
+    path('asset-list/data/',
+         views.AssetListDataView.as_view(), name="asset_list_data"),
+    path('asset-list/export/',
+         views.AssetExportView.as_view(), name="asset_export"),
     path('asset-form/', views.AssetCreateView.as_view(), name="asset_form"),
+    path('asset-import/',
+         views.AssetImportView.as_view(), name="asset_import"),
     path('asset-update/<pk>/',
          views.AssetUpdateView.as_view(), name="asset_update"),
     path('asset-delete/<pk>/',
          views.AssetDeleteView.as_view(), name="asset_delete"),
     path('asset-status-list/',
          views.AssetStatusListView.as_view(), name="asset_status_list"),
+    path('asset-status-list/export/',
+         views.AssetStatusExportView.as_view(), name="asset_status_export"),
     path('asset-status-new/',
          views.AssetStatusCreateView.as_view(), name="asset_status_new"),
     path('asset-status-update/<pk>/',
@@ -21,6 +29,8 @@ urlpatterns = [
          views.AssetStatusDeleteView.as_view(), name="asset_status_delete"),
     path('category-list/',
          views.CategoryListView.as_view(), name="category_list"),
+    path('category-list/export/',
+         views.CategoryExportView.as_view(), name="category_export"),
     path('category-form/',
          views.CategoryCreateView.as_view(), name="category_form"),
     path('category-update/<pk>/',
@@ -29,6 +39,8 @@ urlpatterns = [
          views.CategoryDeleteView.as_view(), name="category_delete"),
     path('supplier-list/',
          views.SupplierListView.as_view(), name="supplier_list"),
+    path('supplier-list/export/',
+         views.SupplierExportView.as_view(), name="supplier_export"),
     path('supplier-form/',
          views.SupplierCreateView.as_view(), name="supplier_form"),
     path('supplier-update/<pk>/',
@@ -37,6 +49,8 @@ urlpatterns = [
          views.SupplierDeleteView.as_view(), name="supplier_delete"),
     path('department-list/',
          views.DepartmentListView.as_view(), name="department_list"),
+    path('department-list/export/',
+         views.DepartmentExportView.as_view(), name="department_export"),
     path('department-form/',
          views.DepartmentCreateView.as_view(), name="department_form"),
     path('department-update/<pk>/',
@@ -45,16 +59,31 @@ urlpatterns = [
          views.DepartmentDeleteView.as_view(), name="department_delete"),
     path('asset-request-list/',
          views.AssetRequestListView.as_view(), name="asset_request_list"),
+    path('asset-request-list/data/',
+         views.AssetRequestListDataView.as_view(),
+         name="asset_request_list_data"),
+    path('asset-request-list/bulk/',
+         views.AssetRequestBulkView.as_view(), name="asset_request_bulk"),
+    path('asset-request-list/export/',
+         views.AssetRequestExportView.as_view(), name="asset_request_export"),
     path('asset-request-update/<pk>/',
          views.AssetRequestUpdateView.as_view(), name="asset_request_update"),
     path('asset-request-delete/<pk>/',
          views.AssetRequestDeleteView.as_view(), name="asset_request_delete"),
     path('asset-issue-list/',
          views.AssetIssueListView.as_view(), name="asset_issue_list"),
+    path('asset-issue-list/export/',
+         views.AssetIssueExportView.as_view(), name="asset_issue_export"),
     path('asset-issue-form/',
          views.AssetIssueCreateView.as_view(), name="asset_issue_form"),
     path('asset-issue-update/<pk>/',
          views.AssetIssueUpdateView.as_view(), name="asset_issue_update"),
     path('asset-issue-delete/<pk>/',
          views.AssetIssueDeleteView.as_view(), name="asset_issue_delete"),
+    path('export-jobs/',
+         views.ExportJobListView.as_view(), name="export_job_list"),
+    path('export-jobs/<pk>/download/',
+         views.ExportJobDownloadView.as_view(), name="export_job_download"),
+    path('export-jobs/<pk>/cancel/',
+         views.ExportJobCancelView.as_view(), name="export_job_cancel"),
 ]
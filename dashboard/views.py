@@ -1,18 +1,28 @@
-import pytz
+import csv
 from django.shortcuts import redirect, render, get_object_or_404
 from django.views import generic
-from core.utils.decorator import VIEW, ADD, CHANGE, DELETE, perms_require
-from dashboard import forms, models
+from core.utils.decorator import (
+    VIEW, ADD, CHANGE, DELETE, EXPORT, perms_require
+)
+from dashboard import actions, counters, exports, forms, models
+from dashboard.imports import AssetImporter, open_upload
 from django.contrib import messages
 from django.utils.decorators import method_decorator
 from core.utils.utils import redirect_to_another_url
+from dashboard.helpers import time_series
 from django.contrib.messages.views import SuccessMessageMixin
 from accounts import models as ac_models
 from accounts.decorators import login_required
-from django.db.models import Count, F
-from django.http import JsonResponse
-from django.utils.dateparse import parse_date, parse_datetime
-from django.utils import timezone
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Sum
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.utils.dateparse import parse_date
+from core.base.export import ExportView
+from core.utils import renditions
+from core.utils.export import FORMATS, file_response
+from core.base.datatable import (
+    DataTableView, Column, format_datetime, format_timesince
+)
 
 
 @method_decorator([login_required(staff=True)], name="dispatch")
@@ -30,37 +40,36 @@ class IndexTemplateView(generic.TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['user_count'] = ac_models.get_user_model().objects.count()
-        context['designation_count'] = ac_models.DesignationModel.objects.count()  # noqa
-        context['group_count'] = ac_models.Group.objects.count()
-        context['asset_count'] = models.AssetModel.objects.count()
-        context['asset_status_count'] = models.AssetStatusModel.objects.count()
-        context['category_count'] = models.CategoryModel.objects.count()
-        context['supplier_count'] = models.SupplierModel.objects.count()
-        context['department_count'] = models.DepartmentModel.objects.count()
+        context.update(counters.get_counts())
         return context
 
 
 @method_decorator([login_required(staff=True)], name="dispatch")
 class AssetRequestBarChartView(generic.View):
     def get(self, request, *args, **kwargs):
-        start, end = request.GET.get('date').split('&')
-        start_date = parse_date(start)
-        end_date = parse_date(end)
-        if start_date == end_date:
-            end_date = start_date + timezone.timedelta(days=1)
-        object_count = models.AssetRequest.objects.filter(
-            created_at__range=(start_date, end_date)
-        ).values(date=F('created_at')).annotate(count=Count('id'))
-        object_count = [
-            {
-                'date': parse_datetime(str(obj['date'])).replace(
-                    tzinfo=pytz.UTC
-                ).astimezone(timezone.get_current_timezone()),
-                'count': obj['count']
-            } for obj in object_count
-        ]
-        return JsonResponse({'data': list(object_count)}, safe=False)
+        try:
+            series = self.get_series(request.GET)
+        except (KeyError, ValueError, ValidationError):
+            return JsonResponse({'buckets': [], 'values': []}, status=400)
+        return JsonResponse(series)
+
+    @staticmethod
+    def get_series(params):
+        dates = [parse_date(value) for value in params['date'].split('&')]
+        if len(dates) != 2 or None in dates or dates[0] > dates[1]:
+            raise ValueError("Expected a 'start&end' date range.")
+        start, end = dates
+        counts = models.AssetRequestDailyCount.objects.all()
+        if params.get('department'):
+            counts = counts.filter(department_id=params['department'])
+        else:
+            counts = counts.filter(department__isnull=True)
+        if params.get('status'):
+            counts = counts.filter(status=params['status'])
+        return time_series(
+            counts, 'day', start, end,
+            interval=params.get('interval', 'day'), value=Sum('count')
+        )
 
 
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{VIEW}departmentmodel")], name="dispatch")  # noqa
@@ -72,6 +81,19 @@ class DepartmentListView(generic.ListView):
     template_name = "dashboard/department_list.html"
 
 
+@method_decorator([login_required(staff=True), perms_require((f"dashboard.{VIEW}departmentmodel", f"dashboard.{EXPORT}department"))], name="dispatch")  # noqa
+class DepartmentExportView(ExportView):
+    queryset = models.DepartmentModel.objects.all()
+    columns = [
+        Column('Title', field='title', searchable=True),
+        Column('Description', field='description', searchable=True),
+        Column('Active', field='is_active'),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('title', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}departmentmodel")], name="dispatch")  # noqa
 class DepartmentCreateView(generic.CreateView):
     model = models.DepartmentModel
@@ -145,14 +167,101 @@ class DepartmentDeleteView(generic.View):
 
 
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{VIEW}assetmodel")], name="dispatch")  # noqa
-class AssetListView(generic.ListView):
+class AssetListView(generic.TemplateView):
     template_name = 'dashboard/asset_list.html'
     extra_context = {
         "segment": "asset", "sub_segment": "asset_list", "title": "Asset List"
     }
-    queryset = models.AssetModel.objects.prefetch_related(
-        'category', 'department'
-    ).select_related('added_by', 'supplier', 'asset_status').all()
+    query_budget = 5
+
+
+@method_decorator([login_required(staff=True), perms_require(f"dashboard.{VIEW}assetmodel")], name="dispatch")  # noqa
+class AssetListDataView(DataTableView):
+    queryset = models.AssetModel.objects.select_related(
+        'supplier', 'asset_status'
+    )
+    columns = [
+        Column('asset_id', searchable=True),
+        Column(
+            'image', orderable=False,
+            value=lambda obj: renditions.get_url(obj.image, 'asset', 1280)
+        ),
+        Column('title', searchable=True),
+        Column('model', searchable=True),
+        Column('category', orderable=False),
+        Column('status', field='asset_status__title', searchable=True),
+        Column(
+            'status_color', orderable=False,
+            value=lambda obj: getattr(obj.asset_status, 'color', "") or ""
+        ),
+        Column(
+            'employee', orderable=False, value=lambda obj: obj.get_employees()
+        ),
+        Column('supplier', field='supplier__title', searchable=True),
+        Column('department', orderable=False),
+        Column('is_active'),
+        Column(
+            'updated_at', value=lambda obj: format_datetime(obj.updated_at)
+        ),
+        Column(
+            'created_at', value=lambda obj: format_datetime(obj.created_at)
+        ),
+    ]
+    delete_permission = f"dashboard.{DELETE}assetmodel"
+    query_budget = 8
+
+    def get_search_filters(self, search):
+        filters = super().get_search_filters(search)
+        through = models.AssetModel.category.through.objects
+        filters.append(Q(pk__in=through.filter(
+            categorymodel__title__icontains=search
+        ).values('assetmodel_id')))
+        through = models.AssetModel.department.through.objects
+        filters.append(Q(pk__in=through.filter(
+            departmentmodel__title__icontains=search
+        ).values('assetmodel_id')))
+        return filters
+
+    def get_rows(self, objects):
+        self.titles = models.AssetModel.get_related_titles(
+            [obj.pk for obj in objects]
+        )
+        return super().get_rows(objects)
+
+    def get_row(self, obj):
+        row = super().get_row(obj)
+        row['category'] = ",".join(self.titles[obj.pk]['category']) or "None"
+        row['department'] = ",".join(
+            self.titles[obj.pk]['department']
+        ) or "None"
+        return row
+
+
+@method_decorator([perms_require(f"dashboard.{EXPORT}asset")], name="dispatch")  # noqa
+class AssetExportView(ExportView, AssetListDataView):
+    queryset = models.AssetModel.objects.select_related(
+        'asset_status', 'supplier', 'added_by'
+    ).prefetch_related('category', 'department')
+    export_columns = [
+        Column('Asset ID', field='asset_id'),
+        Column('Title', field='title'),
+        Column('Model', field='model'),
+        Column('Description', field='description'),
+        Column('Price', field='price'),
+        Column('Status', field='asset_status__title'),
+        Column('Category', value=lambda obj: ", ".join(
+            category.title for category in obj.category.all()
+        )),
+        Column('Department', value=lambda obj: ", ".join(
+            department.title for department in obj.department.all()
+        )),
+        Column('Supplier', field='supplier__title'),
+        Column('Active', field='is_active'),
+        Column('Added By', value=lambda obj: str(obj.added_by)),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('-created_at', 'pk')
 
 
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}assetmodel")], name="dispatch")  # noqa
@@ -185,6 +294,34 @@ class AssetCreateView(generic.TemplateView):
         return render(request, self.template_name, self.extra_context)
 
 
+@method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}assetmodel")], name="dispatch")  # noqa
+class AssetImportView(generic.FormView):
+    template_name = 'dashboard/asset_import.html'
+    form_class = forms.AssetImportForm
+    extra_context = {
+        "segment": "asset", "sub_segment": "asset_list",
+        "title": "Import Assets"
+    }
+
+    def form_valid(self, form):
+        importer = AssetImporter(
+            self.request.user, request=self.request,
+            dry_run=form.cleaned_data['dry_run']
+        )
+        try:
+            result = importer.run(open_upload(form.cleaned_data['file']))
+        except (UnicodeDecodeError, csv.Error) as e:
+            form.add_error('file', f"The file is not a UTF-8 CSV file: {e}")
+            return self.form_invalid(form)
+        if result.created:
+            messages.success(
+                self.request, f"{result.created} assets added successfully!"
+            )
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result)
+        )
+
+
 @method_decorator([login_required(staff=True)], name="dispatch")
 class AssetUpdateView(generic.TemplateView):
     template_name = 'dashboard/asset_form.html'
@@ -251,6 +388,20 @@ class AssetStatusListView(generic.TemplateView):
         return super().get(request, *args, **kwargs)
 
 
+@method_decorator([login_required(staff=True), perms_require((f"dashboard.{VIEW}assetstatusmodel", f"dashboard.{EXPORT}asset_status"))], name="dispatch")  # noqa
+class AssetStatusExportView(ExportView):
+    queryset = models.AssetStatusModel.objects.all()
+    columns = [
+        Column('Title', field='title', searchable=True),
+        Column('Color', field='color'),
+        Column('Request', field='request'),
+        Column('Active', field='is_active'),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('title', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}assetstatusmodel")], name="dispatch")  # noqa
 class AssetStatusCreateView(generic.TemplateView):
     template_name = "dashboard/asset_status_form.html"
@@ -346,6 +497,19 @@ class CategoryListView(generic.TemplateView):
         return super().get(request, *args, **kwargs)
 
 
+@method_decorator([login_required(staff=True), perms_require((f"dashboard.{VIEW}categorymodel", f"dashboard.{EXPORT}category"))], name="dispatch")  # noqa
+class CategoryExportView(ExportView):
+    queryset = models.CategoryModel.objects.all()
+    columns = [
+        Column('Title', field='title', searchable=True),
+        Column('Description', field='description', searchable=True),
+        Column('Active', field='is_active'),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('title', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}categorymodel")], name="dispatch")  # noqa
 class CategoryCreateView(generic.TemplateView):
     template_name = "dashboard/category_form.html"
@@ -431,6 +595,22 @@ class SupplierListView(generic.ListView):
     extra_context = {"segment": "supplier", "title": "Supplier"}
 
 
+@method_decorator([login_required(staff=True), perms_require((f"dashboard.{VIEW}suppliermodel", f"dashboard.{EXPORT}supplier"))], name="dispatch")  # noqa
+class SupplierExportView(ExportView):
+    queryset = models.SupplierModel.objects.all()
+    columns = [
+        Column('Title', field='title', searchable=True),
+        Column('Email', field='email', searchable=True),
+        Column('Phone', field='phone', searchable=True),
+        Column('Address', field='address', searchable=True),
+        Column('Extra', field='extra'),
+        Column('Active', field='is_active'),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('title', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}suppliermodel")], name="dispatch")  # noqa
 class SupplierCreateView(generic.CreateView):
     model = models.SupplierModel
@@ -502,15 +682,112 @@ class SupplierDeleteView(generic.View):
 
 
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{VIEW}sssetrequest")], name="dispatch")  # noqa
-class AssetRequestListView(generic.ListView):
+class AssetRequestListView(generic.TemplateView):
     template_name = 'dashboard/asset_request_list.html'
     extra_context = {
         "segment": "asset", "sub_segment": "asset_request_list",
         "title": "Asset Request"
     }
+
+
+@method_decorator([login_required(staff=True), perms_require(f"dashboard.{VIEW}sssetrequest")], name="dispatch")  # noqa
+class AssetRequestListDataView(DataTableView):
     queryset = models.AssetRequest.objects.select_related(
         'asset', 'requested', 'approved_by'
-    ).all()
+    )
+    columns = [
+        Column('id', orderable=False, value=lambda obj: str(obj.pk)),
+        Column(
+            'asset', field='asset__title', searchable=True,
+            value=lambda obj: str(obj.asset)
+        ),
+        Column(
+            'requested', field='requested__name', searchable=True,
+            value=lambda obj: str(obj.requested)
+        ),
+        Column(
+            'approved_by', field='approved_by__name', searchable=True,
+            value=lambda obj: str(obj.approved_by)
+        ),
+        Column('details', searchable=True),
+        Column('status', value=lambda obj: obj.get_status()),
+        Column(
+            'status_display', orderable=False,
+            value=lambda obj: obj.get_status_display()
+        ),
+        Column(
+            'request_date',
+            value=lambda obj: format_timesince(obj.request_date)
+        ),
+        Column(
+            'receive_date',
+            value=lambda obj: format_timesince(obj.receive_date)
+        ),
+        Column(
+            'due_date',
+            value=lambda obj: format_datetime(obj.due_date, "DATE_FORMAT")
+        ),
+        Column('comment', searchable=True),
+        Column(
+            'updated_at',
+            value=lambda obj: format_datetime(obj.updated_at, "DATE_FORMAT")
+        ),
+        Column(
+            'created_at',
+            value=lambda obj: format_datetime(obj.created_at, "DATE_FORMAT")
+        ),
+    ]
+    delete_permission = f"dashboard.{DELETE}assetrequest"
+    query_budget = 7
+    # Work queues selected by the ``queue`` parameter, see
+    # ``AssetRequestQuerySet``.
+    queues = ("pending", "expiring", "overdue")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, "request", None)
+        queue = request.GET.get("queue") if request else None
+        if queue in self.queues:
+            queryset = getattr(queryset, queue)()
+        return queryset
+
+
+@method_decorator([login_required(staff=True), perms_require(f"dashboard.{CHANGE}assetrequest")], name="dispatch")  # noqa
+class AssetRequestBulkView(generic.View):
+    """ Applies an ``AssetRequest.BULK_ACTIONS`` action to the selected
+        requests, the ones it does not apply to are skipped.
+    """
+
+    def post(self, request, *args, **kwargs):
+        action = request.POST.get('action')
+        ids = request.POST.getlist('ids')
+        if action not in models.AssetRequest.BULK_ACTIONS or not ids:
+            return HttpResponseBadRequest("Unknown action or no request.")
+        try:
+            changed = actions.apply_bulk_action(request, ids, action)
+        except ValidationError:
+            return HttpResponseBadRequest("Invalid request id.")
+        return JsonResponse({
+            "updated": len(changed), "skipped": len(set(ids)) - len(changed)
+        })
+
+
+@method_decorator([perms_require(f"dashboard.{EXPORT}assetrequest")], name="dispatch")  # noqa
+class AssetRequestExportView(ExportView, AssetRequestListDataView):
+    export_columns = [
+        Column('Asset', value=lambda obj: str(obj.asset)),
+        Column('Requested By', value=lambda obj: str(obj.requested)),
+        Column('Approved By', field='approved_by'),
+        Column('Details', field='details'),
+        Column('Status', value=lambda obj: obj.get_status_display()),
+        Column('Request Date', field='request_date'),
+        Column('Receive Date', field='receive_date'),
+        Column('Return By', field='due_date'),
+        Column('Comment', field='comment'),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('-created_at', 'pk')
 
 
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{VIEW}sssetrequest")], name="dispatch")  # noqa
@@ -532,7 +809,7 @@ class AssetRequestUpdateView(generic.UpdateView, SuccessMessageMixin):
     def form_valid(self, form):
         form_obj = form.save(commit=False)
         form_obj.approved_by = self.request.user
-        form_obj.save()
+        form_obj.save(changed_by=self.request.user)
         messages.success(
             self.request, f"{form_obj.__str__()} was updated successfully"
         )
@@ -577,6 +854,25 @@ class AssetIssueListView(generic.ListView):
     }
 
 
+@method_decorator([login_required(staff=True), perms_require((f"dashboard.{VIEW}sssetissue", f"dashboard.{EXPORT}assetissue"))], name="dispatch")  # noqa
+class AssetIssueExportView(ExportView):
+    queryset = models.AssetIssue.objects.select_related(
+        'asset', 'status', 'raised_by'
+    )
+    columns = [
+        Column('Asset', field='asset__title', searchable=True),
+        Column('Status', field='status__title', searchable=True),
+        Column('Raised By', field='raised_by'),
+        Column('Description', field='description', searchable=True),
+        Column('Fix Date', field='fix_date'),
+        Column('Resolved Date', field='resolved_date'),
+        Column('Comment', field='comment', searchable=True),
+        Column('Updated At', field='updated_at'),
+        Column('Created At', field='created_at'),
+    ]
+    ordering = ('-created_at', 'pk')
+
+
 @method_decorator([login_required(staff=True), perms_require(f"dashboard.{ADD}sssetissue")], name="dispatch")  # noqa
 class AssetIssueCreateView(generic.CreateView):
     model = models.AssetIssue
@@ -652,3 +948,46 @@ class AssetIssueDeleteView(generic.View):
         except Exception as e:
             messages.error(request, f"Internal server error: {e}")
         return redirect('asset_issue_list')
+
+
+@method_decorator([login_required(staff=True)], name="dispatch")
+class ExportJobListView(generic.ListView):
+    template_name = 'dashboard/export_job_list.html'
+    extra_context = {"segment": "export_job", "title": "Export"}
+
+    def get_queryset(self):
+        return models.ExportJob.objects.filter(user=self.request.user)[:50]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["has_active"] = any(
+            job.is_active for job in context["object_list"]
+        )
+        return context
+
+
+@method_decorator([login_required(staff=True)], name="dispatch")
+class ExportJobDownloadView(generic.View):
+    def get(self, request, *args, **kwargs):
+        job = get_object_or_404(
+            models.ExportJob, pk=kwargs['pk'], user=request.user,
+            status=models.ExportJob.JobStatus.DONE
+        )
+        try:
+            return file_response(
+                request, exports.get_path(job), job.filename,
+                FORMATS[job.format][0]
+            )
+        except FileNotFoundError:
+            raise Http404("The export file was removed.")
+
+
+@method_decorator([login_required(staff=True)], name="dispatch")
+class ExportJobCancelView(generic.View):
+    def post(self, request, *args, **kwargs):
+        job = get_object_or_404(
+            models.ExportJob, pk=kwargs['pk'], user=request.user
+        )
+        if exports.cancel(job):
+            messages.success(request, f"{job.filename} was cancelled.")
+        return redirect('export_job_list')